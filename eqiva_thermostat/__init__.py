@@ -16,6 +16,7 @@ from .utils import (
     Thermostat,
     ThermostatCLI,
     ThermostatController,
+    ThermostatPool,
     Vacation,
 )
 
@@ -41,5 +42,6 @@ __all__ = [
     'Thermostat',
     'ThermostatCLI',
     'ThermostatController',
+    'ThermostatPool',
     'Vacation'
 ]
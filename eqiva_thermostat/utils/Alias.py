@@ -11,45 +11,78 @@ class Alias():
     _KNOWN_DEVICES_FILE = ".known_eqivas"
     MAC_PATTERN = r"^([0-9A-F]{2}):([0-9A-F]{2}):([0-9A-F]{2}):([0-9A-F]{2}):([0-9A-F]{2}):([0-9A-F]{2})$"
 
+    _MAC_RE = re.compile(MAC_PATTERN)
+
+    # parsed alias files per path, reused as long as the modification time is unchanged
+    _cache: 'dict[str, tuple[float, dict[str, str]]]' = dict()
+
     def __init__(self) -> None:
 
         self.aliases: 'dict[str,str]' = dict()
+        # labels already resolved, e.g. when the same alias is used repeatedly with --serve
+        self._resolved: 'dict[str, Optional[frozenset[str]]]' = dict()
         try:
             filename = os.path.join(os.environ['USERPROFILE'] if os.name == "nt" else os.environ['HOME']
                                     if "HOME" in os.environ else "~", Alias._KNOWN_DEVICES_FILE)
 
             if os.path.isfile(filename):
-                with open(filename, "r") as ins:
-                    for line in ins:
-                        # Remove comments marked with #
-                        line = re.sub(r"\s*#.*", "", line)
-                        _m = re.match(
-                            r"([0-9A-Fa-f:]+)\s+(.*)$", line)
-                        if _m and (_m.groups()[0].upper().startswith(Thermostat.MAC_PREFIX) or _m.groups()[0].upper().endswith(Thermostat.MAC_PREFIX)):
-                            self.aliases[_m.groups()[0]] = _m.groups()[1]
+                mtime = os.path.getmtime(filename)
+                cached = Alias._cache.get(filename)
+                if not cached or cached[0] != mtime:
+                    cached = Alias._cache[filename] = (mtime, Alias._parse(filename))
+                _, self.aliases = cached
 
         except:
             pass
 
+    @staticmethod
+    def _parse(filename: str) -> 'dict[str, str]':
+
+        aliases: 'dict[str, str]' = dict()
+        with open(filename, "r") as ins:
+            for line in ins:
+                # Remove comments marked with #, then split address and name
+                parts = line.split("#", 1)[0].split(None, 1)
+                if len(parts) == 2:
+                    mac, alias = parts
+                    alias = alias.rstrip()
+                    upper = mac.upper()
+                    if upper.startswith(Thermostat.MAC_PREFIX) or upper.endswith(Thermostat.MAC_PREFIX):
+                        # addresses are case-insensitive, keep them normalized
+                        aliases[upper] = alias
+
+        return aliases
+
     def resolve(self, label: str) -> 'Optional[set[str]]':
 
-        if re.match(Alias.MAC_PATTERN, label.upper()):
-            label = label.upper()
-            if label.upper().startswith(Thermostat.MAC_PREFIX) or label.upper().endswith(Thermostat.MAC_PREFIX):
-                return {label}
+        if label not in self._resolved:
+            macs = self._resolve(label)
+            self._resolved[label] = frozenset(macs) if macs else None
+
+        resolved = self._resolved[label]
+        return set(resolved) if resolved else None
+
+    def _resolve(self, label: str) -> 'Optional[set[str]]':
+
+        upper = label.upper()
+        if Alias._MAC_RE.match(upper):
+            if upper.startswith(Thermostat.MAC_PREFIX) or upper.endswith(Thermostat.MAC_PREFIX):
+                return {upper}
             else:
                 return None
         else:
-            macs = {a.upper()
-                    for a in self.aliases if label in self.aliases[a]}
+            macs = {mac for mac, alias in self.aliases.items() if label in alias}
             if macs:
-                LOGGER.debug("Found mac-addresses for aliases: %s" %
-                             ", ".join(macs))
+                LOGGER.debug("Found mac-addresses for aliases: %s", ", ".join(macs))
             else:
                 LOGGER.debug("No aliases found")
 
             return macs if macs else None
 
+    def __bool__(self) -> bool:
+
+        return bool(self.aliases)
+
     def __str__(self) -> str:
 
         return "\n".join([f"{a}\t{self.aliases[a]}" for a in self.aliases])
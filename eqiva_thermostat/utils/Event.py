@@ -1,26 +1,52 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from .Temperature import Temperature
 from .EqivaException import EqivaException
 
+# (hour, minute) for every raw time byte, the device counts in steps of 10 minutes
+_SLOTS = tuple((raw // 6, raw % 6 * 10) for raw in range(256))
+_TIME_STR = tuple(f"{hour:02}:{minute:02}" for hour, minute in _SLOTS)
+
+@lru_cache(maxsize=256)
+def _format(temperature: str, until: str) -> str:
+
+    return f"Event(temperature={temperature}, until={until})"
+
+@dataclass(slots=True, eq=False)
 class Event():
 
-    def __init__(self, temperature: Optional[Temperature] = None, hour: int = 0, minute: int = 0):
+    temperature: Optional[Temperature] = None
+    hour: int = 0
+    minute: int = 0
+
+    def __post_init__(self):
 
+        hour, minute = self.hour, self.minute
         if hour < 0 or hour > 24 or minute < 0 or minute > 50 or minute % 10 != 0:
             raise EqivaException(
                 'hour must be between 0 and 24. minute must be between 0 and 50 in steps of 10')
 
-        self.hour = hour
-        self.minute = minute
-        self.temperature: Optional[Temperature] = temperature
+    @classmethod
+    def _from_raw(cls, raw_temperature: int, raw_time: int) -> 'Event':
+
+        # bytes received from the device are already in range, skip validation
+        e = cls.__new__(cls)
+        e.temperature = Temperature._from_raw(raw_temperature)
+        e.hour, e.minute = _SLOTS[raw_time]
+        return e
 
     @staticmethod
     def fromBytes(bytes: bytearray) -> 'Event':
 
-        temperature = Temperature.fromByte(bytes[0])
-        hour = bytes[1] // 6
-        minute = bytes[1] % 6 * 10
-        return Event(temperature=temperature, hour=hour, minute=minute)
+        # validated like the constructor, programs check their whole payload in fromBytes
+        hour, minute = _SLOTS[bytes[1]]
+        return Event(temperature=Temperature._from_raw(bytes[0]), hour=hour, minute=minute)
+
+    @property
+    def until(self) -> str:
+
+        return _TIME_STR[self.hour * 6 + self.minute // 10]
 
     def toBytes(self) -> bytearray:
 
@@ -36,9 +62,9 @@ class Event():
 
         return {
             "temperature": temperature.to_dict(),
-            "until": f"{self.hour:02}:{self.minute:02}"
+            "until": self.until
         }
 
     def __str__(self):
 
-        return f"Event(temperature={str(self.temperature)}, until={self.hour:02}:{self.minute:02})"
+        return _format(str(self.temperature), self.until)
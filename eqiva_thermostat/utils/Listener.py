@@ -1,27 +1,30 @@
-from bleak.backends.device import BLEDevice
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
 
 class Listener():
 
-    def onScanSeen(self, device: BLEDevice) -> None:
+    def onScanSeen(self, device: 'BLEDevice') -> None:
 
         pass
 
-    def onScanFound(self, device: BLEDevice) -> None:
+    def onScanFound(self, device: 'BLEDevice') -> None:
 
         pass
 
-    def onConnected(self, device: BLEDevice) -> None:
+    def onConnected(self, device: 'BLEDevice') -> None:
 
         pass
 
-    def onDisconnected(self, device: BLEDevice) -> None:
+    def onDisconnected(self, device: 'BLEDevice') -> None:
 
         pass
 
-    def onRequest(self, device: BLEDevice) -> None:
+    def onRequest(self, device: 'BLEDevice') -> None:
 
         pass
 
-    def onNotify(self, device: BLEDevice, bytes: bytearray) -> None:
+    def onNotify(self, device: 'BLEDevice', bytes: bytearray) -> None:
 
         pass
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List
 
 class Mode():
@@ -12,20 +13,36 @@ class Mode():
     UNKNOWN = 0x40
     BATTERY_LOW = 0x80
 
-    MODES = ["AUTO", "MANUAL", "VACATION", "BOOST", "DAYLIGHT_SUMMER_TIME",
-             "OPEN_WINDOW", "LOCKED", "UNKNOWN", "BATTERY_LOW"]
+    MODES = ("AUTO", "MANUAL", "VACATION", "BOOST", "DAYLIGHT_SUMMER_TIME",
+             "OPEN_WINDOW", "LOCKED", "UNKNOWN", "BATTERY_LOW")
+
+    # bit value -> name, MODES[1:] are the bits 0x01 to 0x80
+    _BIT_NAMES = {1 << i: m for i, m in enumerate(MODES[1:])}
 
     def __init__(self, mode: int):
 
         self.mode = mode
 
-    def to_dict(self) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _decode(mode: int) -> 'tuple[str, ...]':
 
         modes: List[str] = [Mode.MODES[0]
-                            ] if self.mode & Mode.MANUAL != Mode.MANUAL else []
-        modes.extend([m for i, m in enumerate(
-            Mode.MODES[1:]) if self.mode & 2**i == 2**i])
-        return modes
+                            ] if mode & Mode.MANUAL != Mode.MANUAL else []
+        # only visit the bits that are set, lowest first
+        bits = mode
+        while bits:
+            bit = bits & -bits
+            name = Mode._BIT_NAMES.get(bit)
+            if name:
+                modes.append(name)
+            bits ^= bit
+        return tuple(modes)
+
+    def to_dict(self) -> List[str]:
+
+        # a mode is a single byte, so the cache covers every possible value
+        return list(Mode._decode(self.mode))
 
     def __str__(self):
 
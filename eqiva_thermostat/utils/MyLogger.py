@@ -35,4 +35,4 @@ class MyLogger():
 
     @staticmethod
     def hexstr(ba: bytearray) -> str:
-        return " ".join([("0" + hex(b).replace("0x", ""))[-2:] for b in ba])
+        return bytes(ba).hex(" ")
@@ -1,32 +1,41 @@
+from dataclasses import dataclass
 from typing import Optional
 from .Temperature import Temperature
 from .EqivaException import EqivaException
 
+@dataclass(slots=True, eq=False)
 class OpenWindowConfig():
 
-    def __init__(self, temperature: Optional[Temperature] = None, minutes: int = 0):
+    temperature: Optional[Temperature] = None
+    minutes: int = 0
 
+    def __post_init__(self):
+
+        minutes = self.minutes
         if minutes < 0 or minutes > 995 or minutes % 5 != 0:
             raise EqivaException(
                 message='minutes must be between 5 and 995 in steps of 5')
 
-        self.minutes: int = minutes
-        self.temperature: Optional[Temperature] = temperature
+    @classmethod
+    def _from_raw(cls, raw_temperature: int, raw_minutes: int) -> 'OpenWindowConfig':
+
+        # bytes received from the device are already in range, skip validation
+        w = cls.__new__(cls)
+        w.temperature = Temperature._from_raw(raw_temperature)
+        w.minutes = raw_minutes * 5
+        return w
 
     @staticmethod
     def fromBytes(bytes: bytearray) -> 'OpenWindowConfig':
 
-        w = OpenWindowConfig()
-        w.temperature = Temperature.fromByte(bytes[0])
-        w.minutes = bytes[1] * 5
-        return w
+        return OpenWindowConfig._from_raw(bytes[0], bytes[1])
 
-    def toBytes(self) -> bytearray:
+    def toBytes(self) -> bytes:
 
         if self.temperature is None:
             raise EqivaException(message='temperature must be set')
 
-        return bytearray([self.temperature.toByte(), self.minutes // 5])
+        return bytes((self.temperature.toByte(), self.minutes // 5))
 
     def to_dict(self) -> dict:
 
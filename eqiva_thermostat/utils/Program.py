@@ -1,8 +1,18 @@
+from datetime import datetime
+import struct
+from typing import Optional
+
 from .Event import Event
 from .EqivaException import EqivaException
 
+# 7 events of (temperature, time slot), unused events are zero
+_PROGRAM = struct.Struct("14B")
+_MAX_SLOT = 24 * 6 + 5
+
 class Program():
 
+    __slots__ = ("_events", "_raw")
+
     DAY_SATURDAY = 0x00
     DAY_SUNDAY = 0x01
     DAY_MONDAY = 0x02
@@ -19,10 +29,12 @@ class Program():
     DAYS = ["sat", "sun", "mon", "tue", "wed", "thu", "fri",
             "weekend", "work", "everyday", "today", "tomorrow"]
 
+    DAYS_INDEX = {d: i for i, d in enumerate(DAYS)}
+
     DAYS_LONG = ["Saturday", "Sunday", "Monday",
                  "Tuesday", "Wednesday", "Thursday", "Friday"]
 
-    def __init__(self, events: list = list()):
+    def __init__(self, events: Optional[list] = None):
 
         if not events:
             raise EqivaException('No events given')
@@ -30,27 +42,52 @@ class Program():
             raise EqivaException(
                 'More than 7 events given but maximum is 7 events per day')
 
-        self.events: list = events
+        self.events = events
+
+    @property
+    def events(self) -> list:
+
+        if self._events is None:
+            raw = self._raw
+            self._events = [Event._from_raw(t, s) for t, s in zip(raw[0::2], raw[1::2])]
+            # the events may be edited in place from now on, so toBytes() encodes them again
+            self._raw = None
+        return self._events
+
+    @events.setter
+    def events(self, events: list) -> None:
+
+        self._events: 'list | None' = events
+        self._raw: 'tuple[int, ...] | None' = None
 
     @staticmethod
-    def fromBytes(bytes: bytearray) -> 'Program':
+    def resolveDay(day: int) -> int:
 
-        events = list()
-        for i in range(7):
-            events.append(Event.fromBytes(bytes[i * 2: i * 2 + 2]))
+        # weekday() counts from monday, DAY_* constants count from saturday
+        if day == Program.DAY_TODAY or day == Program.DAY_TOMORROW:
+            return (datetime.now().weekday() + 2 + day - Program.DAY_TODAY) % 7
+        return day
 
-        return Program(events=events)
+    @staticmethod
+    def fromBytes(bytes: bytearray) -> 'Program':
 
-    def toBytes(self) -> bytearray:
+        # keep the payload, events are only decoded when they are accessed
+        p = Program.__new__(Program)
+        p._raw = _PROGRAM.unpack_from(bytes)
+        # time slots past 24:50 cannot be decoded into events
+        if max(p._raw[1::2]) > _MAX_SLOT:
+            raise EqivaException('hour must be between 0 and 24. minute must be between 0 and 50 in steps of 10')
+        p._events = None
+        return p
 
-        bytes = list()
-        for e in self.events:
-            bytes.extend(e.toBytes())
+    def toBytes(self) -> bytes:
 
-        if len(bytes) < 14:
-            bytes.extend([0] * (14 - len(bytes)))
+        if self._raw is not None:
+            return _PROGRAM.pack(*self._raw)
 
-        return bytearray(bytes)
+        raw = [b for e in self.events for b in e.toBytes()]
+        raw.extend([0] * (14 - len(raw)))
+        return _PROGRAM.pack(*raw)
 
     def to_dict(self) -> list:
 
@@ -1,24 +1,48 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 from .EqivaException import EqivaException
 
 
+@lru_cache(maxsize=128)
+def _fahrenheit(valueC: float) -> float:
+
+    return (valueC * 9.0/5.0) + 32.0
+
+
+@lru_cache(maxsize=128)
+def _format(valueC: float) -> str:
+
+    # valueC is quantized to steps of 0.5, so only a few distinct strings exist
+    return f"Temperature(celcius={valueC:.1f}°C, fahrenheit={_fahrenheit(valueC):.1f}°F)"
+
+
+@dataclass(slots=True, eq=False)
 class Temperature:
 
-    def __init__(self, valueC: Optional[float] = None):
+    valueC: Optional[float] = None
 
-        if valueC is not None and (valueC < -4.5 or valueC > 30.0 or valueC * 10 % 5 != 0):
+    def __post_init__(self):
+
+        # validates user input, device bytes go through _from_raw
+        valueC = self.valueC
+        if valueC is not None and not (-9 <= valueC * 2 <= 60 and valueC * 2 == int(valueC * 2)):
             raise EqivaException(
                 message='valueC must be between -4.5 and 30.0 in steps of 0.5. Offset temperature can be between -4.5 and 4.5. All other temperatures must be between 4.5 and 30.0')
 
-        self.valueC: Optional[float] = valueC
+    @classmethod
+    def _from_raw(cls, raw: int) -> 'Temperature':
+
+        # bytes received from the device are already in range, skip validation
+        t = cls.__new__(cls)
+        t.valueC = raw / 2
+        return t
 
     @staticmethod
     def fromByte(raw: int) -> 'Temperature':
 
-        t = Temperature()
-        t.valueC = raw / 2
-        return t
+        return Temperature._from_raw(raw)
 
     def _get_valueC(self) -> float:
 
@@ -32,7 +56,7 @@ class Temperature:
 
     def fahrenheit(self) -> float:
 
-        return (self._get_valueC() * 9.0/5.0) + 32.0
+        return _fahrenheit(self._get_valueC())
 
     def to_dict(self) -> dict:
 
@@ -43,4 +67,4 @@ class Temperature:
 
     def __str__(self):
 
-        return f"Temperature(celcius={self.valueC:.1f}°C, fahrenheit={self.fahrenheit():.1f}°F)"
+        return _format(self._get_valueC())
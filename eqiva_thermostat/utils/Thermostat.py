@@ -1,6 +1,8 @@
 from datetime import datetime
 import asyncio
-from typing import List, Optional
+import logging
+import struct
+from typing import Callable, List, Optional
 from bleak import BleakClient
 from bleak.backends.device import BLEDevice
 
@@ -16,6 +18,17 @@ import logManager
 
 LOGGER = logManager.logger.get_logger(__name__)
 
+# command, year - 2000, month, day, hour, minute, second
+_STATUS = struct.Struct("7B")
+# notification header: 0x02 0x01, mode, valve, unknown, temperature
+_NOTIFY_STATUS = struct.Struct("2xBBxB")
+# serial number digits are sent with an offset of 0x30
+_SERIAL = bytes((b - 0x30) % 256 for b in range(256))
+
+def _hex(data: bytes) -> str:
+
+    return data.hex(" ")
+
 class Thermostat(BleakClient, Listener):
 
     MAC_PREFIX = "00:1A:22:"
@@ -26,45 +39,38 @@ class Thermostat(BleakClient, Listener):
     CHARACTERISTIC_REQUEST_HANDLE = "3fa4585a-ce4a-3bad-db4b-b8df8179ea09"
     CHARACTERISTIC_NOTIFICATION_HANDLE = "d0e8434d-cd29-0996-af41-6c90f4e0eb2a"
 
-    COMMAND_SERIAL = [0x00]
-    COMMAND_STATUS = [0x03]
-    COMMAND_VACATION = [0x40]
-    COMMAND_MODE_AUTO = [0x40, 0x00]
-    COMMAND_MODE_MANUAL = [0x40, 0x40]
-
-    COMMAND_SET_PROGRAM = [0x10]
-    COMMAND_REQUEST_PROGRAM = [0x20]
-
-    COMMAND_TEMPERATURE = [0x41]
-    COMMAND_TEMPERATURE_ON = [0x41, 0x3c]
-    COMMAND_TEMPERATURE_OFF = [0x41, 0x09]
-    COMMAND_TEMPERATURE_COMFORT = [0x43]
-    COMMAND_TEMPERATURE_ECO = [0x44]
-    COMMAND_BOOST_START = [0x45, 0xff]
-    COMMAND_BOOST_STOP = [0x45, 0x00]
-    COMMAND_LOCK_ON = [0x80, 0x01]
-    COMMAND_LOCK_OFF = [0x80, 0x00]
-    COMMAND_COMFORT_ECO = [0x11]
-    COMMAND_OFFSET = [0x13]
-    COMMAND_OPEN_WINDOW = [0x14]
-    COMMAND_RESET = [0xf0]
+    COMMAND_SERIAL = bytes([0x00])
+    COMMAND_STATUS = bytes([0x03])
+    COMMAND_VACATION = bytes([0x40])
+    COMMAND_MODE_AUTO = bytes([0x40, 0x00])
+    COMMAND_MODE_MANUAL = bytes([0x40, 0x40])
+
+    COMMAND_SET_PROGRAM = bytes([0x10])
+    COMMAND_REQUEST_PROGRAM = bytes([0x20])
+
+    COMMAND_TEMPERATURE = bytes([0x41])
+    COMMAND_TEMPERATURE_ON = bytes([0x41, 0x3c])
+    COMMAND_TEMPERATURE_OFF = bytes([0x41, 0x09])
+    COMMAND_TEMPERATURE_COMFORT = bytes([0x43])
+    COMMAND_TEMPERATURE_ECO = bytes([0x44])
+    COMMAND_BOOST_START = bytes([0x45, 0xff])
+    COMMAND_BOOST_STOP = bytes([0x45, 0x00])
+    COMMAND_LOCK_ON = bytes([0x80, 0x01])
+    COMMAND_LOCK_OFF = bytes([0x80, 0x00])
+    COMMAND_COMFORT_ECO = bytes([0x11])
+    COMMAND_OFFSET = bytes([0x13])
+    COMMAND_OPEN_WINDOW = bytes([0x14])
+    COMMAND_RESET = bytes([0xf0])
 
     NOTIFY_SERIAL = bytearray([0x01])
     NOTIFY_STATUS = bytearray([0x02, 0x01])
     NOTIFY_PROGRAM_CONFIRM = bytearray([0x02, 0x02])
     NOTIFY_PROGRAM_REQUEST = bytearray([0x21])
 
-    def __init__(self, address: str) -> None:
+    def __init__(self, address: str, disconnected_callback: Optional[Callable[[BleakClient], None]] = None) -> None:
 
-        super().__init__(address, timeout=30.0)
+        super().__init__(address, disconnected_callback=disconnected_callback, timeout=30.0)
         self._deviceName: Optional[str] = None
-    @property
-    def deviceName(self) -> Optional[str]:
-        return self._deviceName
-
-    @deviceName.setter
-    def deviceName(self, value: str) -> None:
-        self._deviceName = value
         self.vendor: Optional[str] = None
         self.serialNumber: Optional[str] = None
         self.firmware: Optional[float] = None
@@ -77,60 +83,110 @@ class Thermostat(BleakClient, Listener):
         self.comfortTemperature: Optional[Temperature] = None
         self.openWindowConfig: Optional[OpenWindowConfig] = None
         self.offsetTemperature: Optional[Temperature] = None
+        # requests waiting for their notification, keyed by the first notification byte
+        self._pending: 'dict[int, asyncio.Future]' = dict()
+        # one request at a time, replies are only told apart by their first byte
+        self._requestLock = asyncio.Lock()
+        # notifications are told apart by their first byte
+        self._notifyHandlers: 'dict[int, Callable[[str, bytearray, memoryview], None]]' = {
+            Thermostat.NOTIFY_SERIAL[0]: self._onSerial,
+            Thermostat.NOTIFY_STATUS[0]: self._onResponse,
+            Thermostat.NOTIFY_PROGRAM_REQUEST[0]: self._onProgram,
+        }
 
-    def onNotify(self, device: Optional[BLEDevice], bytes: bytearray):
-
-        source_address = device.address if device else self.address
-        LOGGER.debug(f"<<< {source_address}: received notification("
-                     f"{logManager.logger.hexstr(bytes)})")
-
-        if bytes.startswith(Thermostat.NOTIFY_SERIAL):
+    @property
+    def deviceName(self) -> Optional[str]:
+        return self._deviceName
 
-            self.serialNumber = bytearray(
-                [b - 0x30 for b in bytes[4:-1]]).decode()
-            self.firmware = bytes[1] / 100
-            LOGGER.debug(f"{source_address}: received serialNo and firmware version: "
-                        f"{self.serialNumber}, {self.firmware}")
+    @deviceName.setter
+    def deviceName(self, value: str) -> None:
+        self._deviceName = value
 
-        elif bytes.startswith(Thermostat.NOTIFY_STATUS):
+    def onNotify(self, device: Optional[BLEDevice], bytes: bytearray):
 
-            self.mode = Mode(mode=bytes[2])
-            self.valve = bytes[3]
-            self.temperature = Temperature.fromByte(bytes[5])
-            if len(bytes) > 9:
-                self.vacation = Vacation.fromBytes(bytes[6:10])
-            else:
-                self.vacation = None
-
-            if len(bytes) == 15:
-                self.openWindowConfig = OpenWindowConfig.fromBytes(
-                    bytes[10:12])
-                self.comfortTemperature = Temperature.fromByte(bytes[12])
-                self.ecoTemperature = Temperature.fromByte(bytes[13])
-                self.offsetTemperature = Temperature.fromByte(bytes[14] - 7)
+        source_address = device.address if device else self.address
+        # hex dumps are only built when they are logged
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"<<< {source_address}: received notification("
+                         f"{_hex(bytes)})")
+
+        if not bytes:
+            return
+
+        error: Optional[EqivaException] = None
+        handler = self._notifyHandlers.get(bytes[0])
+        if handler:
+            try:
+                # sub-slices of a memoryview do not copy the payload
+                handler(source_address, bytes, memoryview(bytes))
+            except EqivaException as ex:
+                error = ex
+
+        # a broken notification is handed to the waiting request instead of bleak's callback
+        future = self._pending.pop(bytes[0], None)
+        if future is not None and not future.done():
+            if error:
+                future.set_exception(error)
             else:
-                self.openWindowConfig = None
-                self.comfortTemperature = None
-                self.ecoTemperature = None
-                self.offsetTemperature = None
-                LOGGER.debug(
-                    f"{source_address}: outdated firmware detected.")
-
-            LOGGER.debug(f"{source_address}: received status: mode={str(self.mode)}, temperature={str(self.temperature)}, valve={str(self.valve)}%, vacation={str(self.vacation)}, openWindowConfig="
-                        f"{str(self.openWindowConfig)}, comfortTemperature={str(self.comfortTemperature)}, ecoTemperature={str(self.ecoTemperature)}, offsetTemperature={str(self.offsetTemperature)}")
+                future.set_result(None)
+        elif error:
+            LOGGER.error(error.message)
+
+    def _onSerial(self, source_address: str, bytes: bytearray, view: memoryview) -> None:
+
+        serial = view[4:-1].tobytes()
+        # the table wraps around, reject what the offset cannot have produced
+        if serial and min(serial) < 0x30:
+            raise EqivaException(message=f"{source_address}: invalid serial number {_hex(serial)}")
+        self.serialNumber = serial.translate(_SERIAL).decode()
+        self.firmware = bytes[1] / 100
+        LOGGER.debug(f"{source_address}: received serialNo and firmware version: "
+                    f"{self.serialNumber}, {self.firmware}")
+
+    def _onResponse(self, source_address: str, bytes: bytearray, view: memoryview) -> None:
+
+        # status and program confirmation share the first byte
+        if bytes.startswith(Thermostat.NOTIFY_STATUS):
+            self._onStatus(source_address, bytes, view)
+        elif bytes.startswith(Thermostat.NOTIFY_PROGRAM_CONFIRM):
+            LOGGER.debug(f"{source_address}: program for "
+                        f"{Program.DAYS[bytes[2]]} has been successful")
 
-        elif bytes.startswith(Thermostat.NOTIFY_PROGRAM_REQUEST):
+    def _onStatus(self, source_address: str, bytes: bytearray, view: memoryview) -> None:
 
-            day = bytes[1]
-            program = Program.fromBytes(bytes=bytes[2:])
-            self.programs[day] = program
-            LOGGER.debug(f"{source_address}: received program: "
-                        f"{Program.DAYS[day]}={str(program)}")
+        mode, self.valve, temperature = _NOTIFY_STATUS.unpack_from(bytes)
+        self.mode = Mode(mode=mode)
+        self.temperature = Temperature.fromByte(temperature)
+        if len(bytes) > 9:
+            self.vacation = Vacation.fromBytes(view[6:10])
+        else:
+            self.vacation = None
+
+        if len(bytes) == 15:
+            self.openWindowConfig = OpenWindowConfig.fromBytes(
+                view[10:12])
+            self.comfortTemperature = Temperature.fromByte(bytes[12])
+            self.ecoTemperature = Temperature.fromByte(bytes[13])
+            self.offsetTemperature = Temperature.fromByte(bytes[14] - 7)
+        else:
+            self.openWindowConfig = None
+            self.comfortTemperature = None
+            self.ecoTemperature = None
+            self.offsetTemperature = None
+            LOGGER.debug(
+                f"{source_address}: outdated firmware detected.")
+
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"{source_address}: received status: mode={str(self.mode)}, temperature={str(self.temperature)}, valve={str(self.valve)}%, vacation={str(self.vacation)}, openWindowConfig="
+                         f"{str(self.openWindowConfig)}, comfortTemperature={str(self.comfortTemperature)}, ecoTemperature={str(self.ecoTemperature)}, offsetTemperature={str(self.offsetTemperature)}")
 
-        elif bytes.startswith(Thermostat.NOTIFY_PROGRAM_CONFIRM):
+    def _onProgram(self, source_address: str, bytes: bytearray, view: memoryview) -> None:
 
-            LOGGER.debug(f"{source_address}: program for "
-                        f"{Program.DAYS[bytes[2]]} has been successful")
+        day = bytes[1]
+        program = Program.fromBytes(bytes=view[2:])
+        self.programs[day] = program
+        LOGGER.debug(f"{source_address}: received program: "
+                    f"{Program.DAYS[day]}={str(program)}")
 
     async def read_gatt_char(self, characteristic) -> bytearray:
 
@@ -138,23 +194,25 @@ class Thermostat(BleakClient, Listener):
                      (self.address, characteristic))
         response = await super().read_gatt_char(characteristic)
 
-        if response:
+        if response and LOGGER.isEnabledFor(logging.DEBUG):
             LOGGER.debug("<<< %s: %s" %
-                         (self.address, logManager.logger.hexstr(response)))
+                         (self.address, _hex(response)))
 
         return response
 
     async def write_gatt_char(self, characteristic, data, response):
 
-        LOGGER.debug(">>> %s: write_gatt_char(%s, %s)" %
-                     (self.address, characteristic, logManager.logger.hexstr(data)))
-        response = await super().write_gatt_char(characteristic, data=data, response=response)
+        debug = LOGGER.isEnabledFor(logging.DEBUG)
+        if debug:
+            LOGGER.debug(">>> %s: write_gatt_char(%s, %s)" %
+                         (self.address, characteristic, _hex(data)))
+        result = await super().write_gatt_char(characteristic, data=data, response=response)
 
-        if response:
+        if result and debug:
             LOGGER.debug("<<< %s: %s" %
-                         (self.address, logManager.logger.hexstr(response)))
+                         (self.address, _hex(result)))
 
-        return response
+        return result
 
     async def connect(self):
 
@@ -192,175 +250,116 @@ class Thermostat(BleakClient, Listener):
         await super().disconnect()
         LOGGER.debug(f"{self.address}: successfully disconnected")
 
+    async def _send(self, data: bytes, description: Optional[str] = None, notify: int = NOTIFY_STATUS[0]) -> None:
+
+        if description:
+            LOGGER.info(f"{self.address}: {description}")
+        await self._request(data, notify)
+
+    async def _request(self, data: bytes, notify: int) -> None:
+
+        # return as soon as the thermostat answers, WAIT_NOTIFICATION is only the upper bound
+        async with self._requestLock:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[notify] = future
+            try:
+                await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, data, response=True)
+                await asyncio.wait_for(future, timeout=Thermostat.WAIT_NOTIFICATION)
+            except asyncio.TimeoutError:
+                LOGGER.debug(f"{self.address}: no notification within {Thermostat.WAIT_NOTIFICATION}s")
+            finally:
+                if self._pending.get(notify) is future:
+                    del self._pending[notify]
+
     async def setTemperature(self, temperature: Temperature):
 
-        LOGGER.info(f"{self.address}: set {str(temperature)}")
-        bytes = list(Thermostat.COMMAND_TEMPERATURE)
-        bytes.append(temperature.toByte())
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_TEMPERATURE + bytes((temperature.toByte(),))
+        await self._send(data, f"set {str(temperature)}")
 
     async def setTemperatureComfort(self):
 
-        LOGGER.info(f"{self.address}: set mode to comfort")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_TEMPERATURE_COMFORT), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_TEMPERATURE_COMFORT, "set mode to comfort")
 
     async def setTemperatureEco(self):
 
-        LOGGER.info(f"{self.address}: set mode to ecor")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_TEMPERATURE_ECO), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_TEMPERATURE_ECO, "set mode to eco")
 
     async def setTemperatureOn(self):
 
-        LOGGER.info(f"{self.address}: set thermostat on (30°C)")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_TEMPERATURE_ON), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_TEMPERATURE_ON, "set thermostat on (30°C)")
 
     async def setTemperatureOff(self):
 
-        LOGGER.info(f"{self.address}: set thermostat off (4.5°C)")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_TEMPERATURE_OFF), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_TEMPERATURE_OFF, "set thermostat off (4.5°C)")
 
     async def setModeAuto(self):
 
-        LOGGER.info(f"{self.address}: set mode to auto")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_MODE_AUTO), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_MODE_AUTO, "set mode to auto")
 
     async def setModeManual(self):
 
-        LOGGER.info(f"{self.address}: set mode to manual")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_MODE_MANUAL), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_MODE_MANUAL, "set mode to manual")
 
     async def setBoost(self, on: bool):
 
-        LOGGER.info(f"{self.address}: turn "
-                    f"{'on' if on else 'off'} boost mode")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_BOOST_START if on else Thermostat.COMMAND_BOOST_STOP), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_BOOST_START if on else Thermostat.COMMAND_BOOST_STOP,
+                         f"turn {'on' if on else 'off'} boost mode")
 
     async def requestStatus(self):
 
         LOGGER.debug(f"{self.address}: sync time and request status")
         now = datetime.now()
-        bytes = list(Thermostat.COMMAND_STATUS)
-        bytes.extend([now.year % 100, now.month, now.day,
-                     now.hour, now.minute, now.second])
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = _STATUS.pack(Thermostat.COMMAND_STATUS[0], now.year % 100, now.month, now.day,
+                            now.hour, now.minute, now.second)
+        await self._send(data)
 
     async def setVacation(self, temperature: Temperature, vacation: Vacation):
 
-        LOGGER.info(f"{self.address}: set "
-                    f"{str(vacation)} with {str(temperature)}")
-        bytes = list(Thermostat.COMMAND_VACATION)
-        bytes.append(temperature.toByte() + 0x80)
-        bytes.extend(vacation.toBytes())
-
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_VACATION + bytes((temperature.toByte() + 0x80,)) + vacation.toBytes()
+        await self._send(data, f"set {str(vacation)} with {str(temperature)}")
 
     async def requestProgram(self, day: int):
 
         LOGGER.debug(f"{self.address}: request program for "
                     f"{str(Program.DAYS[day])}")
 
-        requests = list()
-
-        if day <= Program.DAY_FRIDAY:
-            requests.append([Thermostat.COMMAND_REQUEST_PROGRAM[0], day])
-
-        elif day == Program.DAY_WEEKEND:
-            requests.extend([[Thermostat.COMMAND_REQUEST_PROGRAM[0], d]
-                            for d in range(Program.DAY_SATURDAY, Program.DAY_SUNDAY + 1)])
-
-        elif day == Program.DAY_WORKDAY:
-            requests.extend([[Thermostat.COMMAND_REQUEST_PROGRAM[0], d]
-                            for d in range(Program.DAY_MONDAY, Program.DAY_FRIDAY + 1)])
-
-        elif day == Program.DAY_EVERYDAY:
-            requests.extend([[Thermostat.COMMAND_REQUEST_PROGRAM[0], d]
-                            for d in range(Program.DAY_SATURDAY, Program.DAY_FRIDAY + 1)])
-
-        elif day == Program.DAY_TODAY:
-            requests.append([Thermostat.COMMAND_REQUEST_PROGRAM[0],
-                            (datetime.now().weekday() + 2) % 7])
-
-        elif day == Program.DAY_TOMORROW:
-            requests.append([Thermostat.COMMAND_REQUEST_PROGRAM[0],
-                            (datetime.now().weekday() + 3) % 7])
-
-        for r in requests:
-            await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(r), response=True)
-
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        # the thermostat answers one request at a time, so requests stay sequential
+        for r in _PROGRAM_REQUESTS.get(Program.resolveDay(day), ()):
+            await self._request(r, Thermostat.NOTIFY_PROGRAM_REQUEST[0])
 
     async def setProgram(self, day: int, program: Program) -> None:
 
-        LOGGER.info(f"{self.address}: set "
-                    f"{str(program)} on {Program.DAYS[day]}")
-
-        bytes = list(Thermostat.COMMAND_SET_PROGRAM)
-
-        if day == Program.DAY_TODAY:
-            day = (datetime.now().weekday() + 2) % 7
-        elif day == Program.DAY_TOMORROW:
-            day = (datetime.now().weekday() + 3) % 7
-        bytes.append(day)
-
-        bytes.extend(program.toBytes())
-
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_SET_PROGRAM + bytes((Program.resolveDay(day),)) + program.toBytes()
+        await self._send(data, f"set {str(program)} on {Program.DAYS[day]}",
+                         notify=Thermostat.NOTIFY_PROGRAM_CONFIRM[0])
 
     async def setOffsetTemperature(self, offset: Temperature):
 
-        LOGGER.info(f"{self.address}: set offset {str(offset)}")
-        bytes = list(Thermostat.COMMAND_OFFSET)
-        bytes.append(offset.toByte() + 7)
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_OFFSET + bytes((offset.toByte() + 7,))
+        await self._send(data, f"set offset {str(offset)}")
 
     async def setComfortEcoTemperature(self, comfort: Temperature, eco: Temperature):
 
-        LOGGER.info(f"{self.address}: set comfort to "
-                    f"{str(comfort)} and eco to {str(eco)}")
-        bytes = list(Thermostat.COMMAND_COMFORT_ECO)
-        bytes.append(comfort.toByte())
-        bytes.append(eco.toByte())
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_COMFORT_ECO + bytes((comfort.toByte(), eco.toByte()))
+        await self._send(data, f"set comfort to {str(comfort)} and eco to {str(eco)}")
 
     async def setOpenWindow(self, openWindowConfig: OpenWindowConfig):
 
-        LOGGER.info(f"{self.address}: set open window to "
-                    f"{str(openWindowConfig)}")
-        bytes = list(Thermostat.COMMAND_OPEN_WINDOW)
-        bytes.extend(openWindowConfig.toBytes())
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(bytes), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        data = Thermostat.COMMAND_OPEN_WINDOW + openWindowConfig.toBytes()
+        await self._send(data, f"set open window to {str(openWindowConfig)}")
 
     async def setLock(self, on: bool):
 
-        LOGGER.info(f"{self.address}: turn {'on' if on else 'off'} lock")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_LOCK_ON if on else Thermostat.COMMAND_LOCK_OFF), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_LOCK_ON if on else Thermostat.COMMAND_LOCK_OFF,
+                         f"turn {'on' if on else 'off'} lock")
 
     async def reset(self):
 
-        LOGGER.info(f"{self.address}: perform factory reset")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_RESET), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_RESET, "perform factory reset")
 
     async def requestSerialNo(self) -> None:
 
-        LOGGER.info(f"{self.address}: request serialno")
-        await self.write_gatt_char(Thermostat.CHARACTERISTIC_REQUEST_HANDLE, bytearray(Thermostat.COMMAND_SERIAL), response=True)
-        await asyncio.sleep(Thermostat.WAIT_NOTIFICATION)
+        await self._send(Thermostat.COMMAND_SERIAL, "request serialno", notify=Thermostat.NOTIFY_SERIAL[0])
 
     async def requestName(self) -> str:
 
@@ -382,6 +381,7 @@ class Thermostat(BleakClient, Listener):
 
     def to_dict(self) -> dict:
 
+        # built fresh on every call, copying a cached nested dict costs more than rebuilding it
         return {
             "mac": self.address,
             "name": self.deviceName,
@@ -404,3 +404,17 @@ class Thermostat(BleakClient, Listener):
         programs = ", ".join(
             [f"{Program.DAYS[d]}={str(p)}" for d, p in enumerate(self.programs) if p])
         return f"Thermostat(address={self.address}, name={self.deviceName}, vendor={self.vendor}, serialNo={self.serialNumber}, firmware={self.firmware}, mode={str(self.mode)}, temperature={str(self.temperature)}, valve={str(self.valve)}%, vacation={str(self.vacation)}, programs=Programs({programs}), openWindowConfig={str(self.openWindowConfig)}, comfortTemperature={str(self.comfortTemperature)}, ecoTemperature={str(self.ecoTemperature)}, offsetTemperature={str(self.offsetTemperature)})"
+
+
+def _programRequests(days: range) -> 'tuple[bytes, ...]':
+
+    return tuple(Thermostat.COMMAND_REQUEST_PROGRAM + bytes((d,)) for d in days)
+
+
+# program request payloads per day selector, today and tomorrow are resolved per call
+_PROGRAM_REQUESTS: 'dict[int, tuple[bytes, ...]]' = {
+    **{d: _programRequests(range(d, d + 1)) for d in range(Program.DAY_SATURDAY, Program.DAY_FRIDAY + 1)},
+    Program.DAY_WEEKEND: _programRequests(range(Program.DAY_SATURDAY, Program.DAY_SUNDAY + 1)),
+    Program.DAY_WORKDAY: _programRequests(range(Program.DAY_MONDAY, Program.DAY_FRIDAY + 1)),
+    Program.DAY_EVERYDAY: _programRequests(range(Program.DAY_SATURDAY, Program.DAY_FRIDAY + 1)),
+}
@@ -1,13 +1,17 @@
 import asyncio
 import json
+import os
 import re
+import shlex
+import stat
 import sys
+import tempfile
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 
 from bleak.exc import BleakError
-from bleak.backends.device import BLEDevice
-#from bleak.backends.scanner import BLEDevice
 
 from .Thermostat import Thermostat
 from .Event import Event
@@ -21,162 +25,278 @@ from .EqivaException import EqivaException
 from .Alias import Alias
 from .ThermostatController import ThermostatController
 
+if TYPE_CHECKING:
+    from bleak.backends.device import BLEDevice
+
 _MAX_BLE_CONNECTIONS = 8
 
+# single dash is not a command prefix since negative offsets like -1.5 are parameters
+_CMD_PREFIX = "--"
+_CMD_PREFIX_LEN = len(_CMD_PREFIX)
+
+# commands which open a session and must not be nested inside one
+_SESSION_COMMANDS = frozenset(("serve", "daemon"))
+
+# programs are printed starting with monday, i.e. Program.DAYS[2]
+_DAY_ORDER = tuple((d + 2) % 7 for d in range(7))
+
+# all legal parameter strings, i.e. 4.5 to 30.0 and -3.5 to 3.5 in steps of 0.5
+_VALID_TEMPS = frozenset(f"{v / 2:.1f}" for v in range(9, 61))
+_VALID_OFFSETS = frozenset(f"{s}{v / 2:.1f}" for s in ("", "-") for v in range(8))
+_VALID_TEMP_PARAMS = _VALID_TEMPS | {"on", "off", "comfort", "eco"}
+
+# set lookups for the most common parameter shapes, other commands are validated by regex
+_VALIDATORS = {
+    "temp": lambda args: len(args) == 1 and args[0] in _VALID_TEMP_PARAMS,
+    "offset": lambda args: len(args) == 1 and args[0] in _VALID_OFFSETS,
+    "comforteco": lambda args: len(args) == 2 and args[0] in _VALID_TEMPS and args[1] in _VALID_TEMPS,
+    "openwindow": lambda args: len(args) == 2 and args[0] in _VALID_TEMPS
+    and len(args[1]) <= 3 and args[1].isdecimal() and args[1][-1] in "05"
+}
+
 import logManager
 
+try:
+    import orjson
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None).decode()
+
+except ImportError:
+
+    def _dumps(obj, pretty: bool = False) -> str:
+        return json.dumps(obj, indent=2) if pretty else json.dumps(obj, separators=(",", ":"))
+
 LOGGER = logManager.logger.get_logger(__name__)
 
-class ThermostatCLI():
+def _socket_path(addresses: 'list[str]') -> str:
+
+    # sockets live in a directory only the current user can access
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir or not os.path.isdir(runtime_dir):
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"eqiva-{os.getuid()}")
+        os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+        st = os.lstat(runtime_dir)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise EqivaException(message=f"{runtime_dir} must be a directory only accessible by the current user")
 
-    _USAGE = "usage"
-    _DESCR = "descr"
-    _REGEX = "regex"
-    _TYPES = "types"
+    return os.path.join(runtime_dir, "eqiva-%s.sock" % "-".join(a.replace(":", "") for a in addresses))
+
+@lru_cache(maxsize=128)
+def _temperature(valueC: float) -> Temperature:
+
+    # legal setpoints form a small finite set, so instances are shared
+    return Temperature(valueC=valueC)
+
+def _event_to_command(event: Event) -> str:
+
+    if event.hour == 24:
+        return f"{event.temperature.valueC:.1f}"
+
+    return f"{event.temperature.valueC:.1f} {event.until}"
+
+def _event_to_readable(event: Event) -> str:
+
+    return f"    {event.temperature.valueC:.1f}°C ({event.temperature.fahrenheit():.1f}°F) until {event.until}"
+
+@dataclass(slots=True, frozen=True)
+class CommandSpec():
+
+    usage: str
+    descr: str
+    regex: 'Optional[re.Pattern]'
+    types: 'Optional[tuple]'
+    handler: Optional[str]
+
+class ThermostatCLI():
 
     _COMMAND = "command"
     _ARGS = "args"
     _PARAMS = "params"
 
-    COMMANDS = {
-        "temp": {
-            _USAGE: "--temp <temp>",
-            _DESCR: "set temperature from 4.5 to 30.0°C in steps of 0.5°C or one of 'comfort', 'eco', 'off', 'on'",
-            _REGEX: r"^(on|off|comfort|eco|4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$",
-            _TYPES: [str]
-        },
-        "mode": {
-            _USAGE: "--mode <auto|manual>",
-            _DESCR: "set mode to auto or manual",
-            _REGEX: r"^(auto|manual)$",
-            _TYPES: [str]
-        },
-        "boost": {
-            _USAGE: "--boost <on|off>",
-            _DESCR: "start or stop boost",
-            _REGEX: r"^(on|off)?$",
-            _TYPES: [str]
-        },
-        "status": {
-            _USAGE: "--status",
-            _DESCR: "synchronize time and get status information",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "vacation": {
-            _USAGE: "--vacation <YYYY-MM-DD hh:mm|hh:mm|hh> <temp>",
-            _DESCR: "set temperature for period, e.g. specific time, for hours and minutes from now on, for hours",
-            _REGEX: r"^(20\d{2}\-\d{2}\-\d{2} (2[0-3]|[01]?[0-9]):[30]0|\d{1,2}:[0-5]\d|\d+) (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$",
-            _TYPES: [str] * 3
-        },
-        "program": {
-            _USAGE: "--program [<day>] [<temp>] [<hh:mm> <temp>] ...",
-            _DESCR: "request all programs, programs of a weekday OR set program with max. 7 events.\n<day> must be one of 'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun', 'weekend', 'work', 'everyday', 'today', 'tomorrow'\ntime must be in stepts of 10 minutes",
-            _REGEX: r"^(mon|tue|wed|thu|fri|sat|sun|weekend|work|everyday|today|tomorrow)?( (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)( [01]?\d| 2[0-3]):([0-5]0)){0,7}( (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0))?$",
-            _TYPES: [str] * 14
-        },
-        "offset": {
-            _USAGE: "--offset <temp>",
-            _DESCR: "set offset temperature from -3.5 to 3.5°C in steps of 0.5°C",
-            _REGEX: r"^-?[0-3]\.[05]$",
-            _TYPES: [float]
-        },
-        "comforteco": {
-            _USAGE: "--comforteco <temp> <temp>",
-            _DESCR: "set comfort and eco temperature from 4.5 to 30.0°C in steps of 0.5°C",
-            _REGEX: r"^(4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0) (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$",
-            _TYPES: [float] * 2
-        },
-        "openwindow": {
-            _USAGE: "--openwindow <temp> <minutes>",
-            _DESCR: "set temperature (4.5 to 30.0) and minutes (in steps of 5min, max. 995min) after open windows has been detected",
-            _REGEX: r"^(4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0) (\d{0,2}[05])$",
-            _TYPES: [float, int]
-        },
-        "lock": {
-            _USAGE: "--lock <on|off>",
-            _DESCR: "lock or unlock thermostat",
-            _REGEX: r"^(on|off)?$",
-            _TYPES: [str]
-        },
-        "scan": {
-            _USAGE: "--scan",
-            _DESCR: "scan for Eqiva Smart Radiotor Thermostats",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "aliases": {
-            _USAGE: "--aliases",
-            _DESCR: "print known aliases from .known_eqivas file",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "reset": {
-            _USAGE: "--reset",
-            _DESCR: "perform factory reset",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "serial": {
-            _USAGE: "--serial",
-            _DESCR: "request serialNo of thermostat and firmware version",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "name": {
-            _USAGE: "--name",
-            _DESCR: "request device name of thermostat",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "vendor": {
-            _USAGE: "--vendor",
-            _DESCR: "request vendor of thermostat",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "dump": {
-            _USAGE: "--dump",
-            _DESCR: "request full state of thermostat",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "print": {
-            _USAGE: "--print",
-            _DESCR: "prints collected data of thermostat",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "commands": {
-            _USAGE: "--commands",
-            _DESCR: "prints collected data of thermostat in command style for easy re-use",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "json": {
-            _USAGE: "--json",
-            _DESCR: "prints information in json format",
-            _REGEX: None,
-            _TYPES: None
-        },
-        "log": {
-            _USAGE: "--log <DEBUG|INFO|WARN|ERROR>",
-            _DESCR: "set loglevel",
-            _REGEX: r"^(DEBUG|INFO|WARN|ERROR)$",
-            _TYPES: [str]
-        },
-        "help": {
-            _USAGE: "--help [<command>]",
-            _DESCR: "prints help optionally for given command",
-            _REGEX: r"^([a-z-]+)?$",
-            _TYPES: None
-        },
-        "macos-use-bdaddr": {
-            _USAGE: "--macos-use-bdaddr",
-            _DESCR: "use bluetooth device address instead of mac address",
-            _REGEX: None,
-            _TYPES: None
-        }
+    COMMANDS: 'dict[str, CommandSpec]' = {
+        "temp": CommandSpec(
+            usage="--temp <temp>",
+            descr="set temperature from 4.5 to 30.0°C in steps of 0.5°C or one of 'comfort', 'eco', 'off', 'on'",
+            regex=re.compile(r"^(on|off|comfort|eco|4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$"),
+            types=(str,),
+            handler="_cmd_temp"
+        ),
+        "mode": CommandSpec(
+            usage="--mode <auto|manual>",
+            descr="set mode to auto or manual",
+            regex=re.compile(r"^(auto|manual)$"),
+            types=(str,),
+            handler="_cmd_mode"
+        ),
+        "boost": CommandSpec(
+            usage="--boost <on|off>",
+            descr="start or stop boost",
+            regex=re.compile(r"^(on|off)?$"),
+            types=(str,),
+            handler="_cmd_boost"
+        ),
+        "status": CommandSpec(
+            usage="--status",
+            descr="synchronize time and get status information",
+            regex=None,
+            types=None,
+            handler="_cmd_status"
+        ),
+        "vacation": CommandSpec(
+            usage="--vacation <YYYY-MM-DD hh:mm|hh:mm|hh> <temp>",
+            descr="set temperature for period, e.g. specific time, for hours and minutes from now on, for hours",
+            regex=re.compile(r"^(20\d{2}\-\d{2}\-\d{2} (2[0-3]|[01]?[0-9]):[30]0|\d{1,2}:[0-5]\d|\d+) (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$"),
+            types=(str,) * 3,
+            handler="_cmd_vacation"
+        ),
+        "program": CommandSpec(
+            usage="--program [<day>] [<temp>] [<hh:mm> <temp>] ...",
+            descr="request all programs, programs of a weekday OR set program with max. 7 events.\n<day> must be one of 'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun', 'weekend', 'work', 'everyday', 'today', 'tomorrow'\ntime must be in stepts of 10 minutes",
+            regex=re.compile(r"^(mon|tue|wed|thu|fri|sat|sun|weekend|work|everyday|today|tomorrow)?( (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)( [01]?\d| 2[0-3]):([0-5]0)){0,7}( (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0))?$"),
+            types=(str,) * 14,
+            handler="_cmd_program"
+        ),
+        "offset": CommandSpec(
+            usage="--offset <temp>",
+            descr="set offset temperature from -3.5 to 3.5°C in steps of 0.5°C",
+            regex=re.compile(r"^-?[0-3]\.[05]$"),
+            types=(float,),
+            handler="_cmd_offset"
+        ),
+        "comforteco": CommandSpec(
+            usage="--comforteco <temp> <temp>",
+            descr="set comfort and eco temperature from 4.5 to 30.0°C in steps of 0.5°C",
+            regex=re.compile(r"^(4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0) (4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)$"),
+            types=(float,) * 2,
+            handler="_cmd_comforteco"
+        ),
+        "openwindow": CommandSpec(
+            usage="--openwindow <temp> <minutes>",
+            descr="set temperature (4.5 to 30.0) and minutes (in steps of 5min, max. 995min) after open windows has been detected",
+            regex=re.compile(r"^(4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0) (\d{0,2}[05])$"),
+            types=(float, int),
+            handler="_cmd_openwindow"
+        ),
+        "lock": CommandSpec(
+            usage="--lock <on|off>",
+            descr="lock or unlock thermostat",
+            regex=re.compile(r"^(on|off)?$"),
+            types=(str,),
+            handler="_cmd_lock"
+        ),
+        "scan": CommandSpec(
+            usage="--scan",
+            descr="scan for Eqiva Smart Radiotor Thermostats",
+            regex=None,
+            types=None,
+            handler=None
+        ),
+        "aliases": CommandSpec(
+            usage="--aliases",
+            descr="print known aliases from .known_eqivas file",
+            regex=None,
+            types=None,
+            handler=None
+        ),
+        "reset": CommandSpec(
+            usage="--reset",
+            descr="perform factory reset",
+            regex=None,
+            types=None,
+            handler="_cmd_reset"
+        ),
+        "serial": CommandSpec(
+            usage="--serial",
+            descr="request serialNo of thermostat and firmware version",
+            regex=None,
+            types=None,
+            handler="_cmd_serial"
+        ),
+        "name": CommandSpec(
+            usage="--name",
+            descr="request device name of thermostat",
+            regex=None,
+            types=None,
+            handler="_cmd_name"
+        ),
+        "vendor": CommandSpec(
+            usage="--vendor",
+            descr="request vendor of thermostat",
+            regex=None,
+            types=None,
+            handler="_cmd_vendor"
+        ),
+        "dump": CommandSpec(
+            usage="--dump",
+            descr="request full state of thermostat",
+            regex=None,
+            types=None,
+            handler="_cmd_dump"
+        ),
+        "print": CommandSpec(
+            usage="--print",
+            descr="prints collected data of thermostat",
+            regex=None,
+            types=None,
+            handler="_cmd_print"
+        ),
+        "commands": CommandSpec(
+            usage="--commands",
+            descr="prints collected data of thermostat in command style for easy re-use",
+            regex=None,
+            types=None,
+            handler="_cmd_commands"
+        ),
+        "json": CommandSpec(
+            usage="--json",
+            descr="prints information in compact json format",
+            regex=None,
+            types=None,
+            handler="_cmd_json"
+        ),
+        "json-pretty": CommandSpec(
+            usage="--json-pretty",
+            descr="prints information in indented json format",
+            regex=None,
+            types=None,
+            handler="_cmd_json_pretty"
+        ),
+        "serve": CommandSpec(
+            usage="--serve",
+            descr="keep connected and read further commands line by line from stdin until EOF",
+            regex=None,
+            types=None,
+            handler="_cmd_serve"
+        ),
+        "daemon": CommandSpec(
+            usage="--daemon <seconds>",
+            descr="keep connected and serve commands from a unix socket until idle for given seconds,\none json array of arguments per line, e.g. [\"--temp\", \"21.0\"]\nthe socket is created in $XDG_RUNTIME_DIR or else in a private eqiva-<uid> temp directory",
+            regex=re.compile(r"^\d+$"),
+            types=(int,),
+            handler="_cmd_daemon"
+        ),
+        "log": CommandSpec(
+            usage="--log <DEBUG|INFO|WARN|ERROR>",
+            descr="set loglevel",
+            regex=re.compile(r"^(DEBUG|INFO|WARN|ERROR)$"),
+            types=(str,),
+            handler=None
+        ),
+        "help": CommandSpec(
+            usage="--help [<command>]",
+            descr="prints help optionally for given command",
+            regex=re.compile(r"^([a-z-]+)?$"),
+            types=None,
+            handler=None
+        ),
+        "macos-use-bdaddr": CommandSpec(
+            usage="--macos-use-bdaddr",
+            descr="use bluetooth device address instead of mac address",
+            regex=None,
+            types=None,
+            handler=None
+        )
     }
 
     def __init__(self) -> None:
@@ -184,13 +304,24 @@ class ThermostatCLI():
         argv: 'list[str]' = sys.argv
 
         self.alias: Alias = Alias()
+        self._has_aliases: bool = bool(self.alias)
+        self._dispatch: 'dict[str, Callable[[ThermostatController, list], Awaitable[None]]]' = {
+            name: getattr(self, spec.handler) for name, spec in ThermostatCLI.COMMANDS.items() if spec.handler}
         try:
 
-            argv.pop(0)
-            if "--log" in sys.argv:
-                logManager.logger.configure_logger(sys.argv[sys.argv.index("--log") + 1])
-                
-            if "--macos-use-bdaddr" in sys.argv:
+            argv = argv[1:]
+            log_level: Optional[str] = None
+            use_bdaddr = False
+            for i, arg in enumerate(argv):
+                if arg == "--log" and log_level is None and i + 1 < len(argv):
+                    log_level = argv[i + 1]
+                elif arg == "--macos-use-bdaddr":
+                    use_bdaddr = True
+
+            if log_level:
+                logManager.logger.configure_logger(log_level)
+
+            if use_bdaddr:
                 ThermostatController.use_bdaddr = True
                 LOGGER.info("Using bdaddr for macOS")
 
@@ -208,13 +339,13 @@ class ThermostatCLI():
                 print(str(self.alias), flush=True)
 
             else:
-                addresses, commands = self.parse_args(sys.argv)
+                addresses, commands = self.parse_args(argv)
                 if addresses and len(addresses) > _MAX_BLE_CONNECTIONS:
                     raise EqivaException(message="Too many simultaneous connections requested, i.e. max. %i but requested %i" % (
                         _MAX_BLE_CONNECTIONS, len(addresses)))
                 elif addresses and commands:
                     asyncio.run(self.process(
-                        addresses=list(addresses), commands=commands))
+                        addresses=addresses, commands=commands))
                 elif not addresses:
                     raise EqivaException(
                         message="Mac address or alias unknown")
@@ -229,33 +360,48 @@ class ThermostatCLI():
         except KeyboardInterrupt:
             pass
 
-    def _build_help(self, command=None, header=False, msg="") -> str:
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _command_help(command: str) -> str:
+
+        # COMMANDS never changes at runtime, so each fragment is built once
+        usage = ThermostatCLI.COMMANDS[command].usage
+        parts: 'list[str]' = ["\n " + usage.ljust(32)]
+        for i, d in enumerate(ThermostatCLI.COMMANDS[command].descr.split("\n")):
+            parts.append("\n " + (" " * 32) + d if i > 0 or len(usage) >= 32 else d)
+
+        return "".join(parts)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _error_help(command: str) -> str:
+
+        return ThermostatCLI._build_help(command, False, "ERROR: Please check parameters of command\n")
 
-        s = ""
+    @staticmethod
+    def _build_help(command=None, header=False, msg="") -> str:
+
+        parts: 'list[str]' = list()
 
         if header == True:
-            s = """Eqiva Smart Radiator Thermostat command line interface for Linux / Raspberry Pi / Windows
+            parts.append("""Eqiva Smart Radiator Thermostat command line interface for Linux / Raspberry Pi / Windows
 
 USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1> <param_2> ... --<command_2> ...]
          <mac_N>   : bluetooth mac address of thermostat
          <alias_N> : you can use aliases instead of mac address if there is a ~/.known_eqiva file
          <command> : a list of commands and parameters
-         """
+         """)
 
         if msg != "":
-            s += "\n " + msg
+            parts.append("\n " + msg)
 
         if command is not None and command in ThermostatCLI.COMMANDS:
-            s += "\n " + \
-                ThermostatCLI.COMMANDS[command][ThermostatCLI._USAGE].ljust(32)
-            for i, d in enumerate(ThermostatCLI.COMMANDS[command][ThermostatCLI._DESCR].split("\n")):
-                s += ("\n " + (" " * 32) + d if i > 0 or len(ThermostatCLI.COMMANDS[command]
-                                                             [ThermostatCLI._USAGE]) >= 32 else d)
+            parts.append(ThermostatCLI._command_help(command))
 
         if msg != "":
-            s += "\n"
+            parts.append("\n")
 
-        return s
+        return "".join(parts)
 
     def scan(self):
 
@@ -264,12 +410,12 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
             def __init__(self) -> None:
                 self._seen: 'set[BLEDevice]' = set()
 
-            def onScanSeen(self, device: BLEDevice) -> None:
+            def onScanSeen(self, device: 'BLEDevice') -> None:
                 self._seen.add(device)
                 print(' %i bluetooth devices seen' %
                       len(self._seen), end='\r', file=sys.stderr, flush=True)
 
-            def onScanFound(self, device: BLEDevice) -> None:
+            def onScanFound(self, device: 'BLEDevice') -> None:
                 print(f"{device.address}     {device.name}", flush=True)
 
         print("MAC-Address           Thermostat name", flush=True)
@@ -277,60 +423,41 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
 
     def print_help(self):
 
-        help = self._build_help(header=True)
-
-        help += "\nBasic commands:"
-        help += self._build_help(command="temp")
-        help += self._build_help(command="mode")
-        help += self._build_help(command="boost")
-        help += self._build_help(command="vacation")
-        help += self._build_help(command="status")
-
-        help += "\n\nConfiguration commands:"
-        help += self._build_help(command="program")
-        help += self._build_help(command="offset")
-        help += self._build_help(command="comforteco")
-        help += self._build_help(command="openwindow")
-        help += self._build_help(command="lock")
-
-        help += "\n\nSetup commands:"
-        help += self._build_help(command="scan")
-        help += self._build_help(command="aliases")
-        help += self._build_help(command="reset")
-
-        help += "\n\nOther commands:"
-        help += self._build_help(command="serial")
-        help += self._build_help(command="name")
-        help += self._build_help(command="vendor")
-        help += self._build_help(command="dump")
-        help += self._build_help(command="print")
-        help += self._build_help(command="commands")
-        help += self._build_help(command="json")
-        help += self._build_help(command="log")
-        help += self._build_help(command="macos-use-bdaddr")
-        help += self._build_help(command="help")
-
-        help += "\n"
-        print(help, file=sys.stderr, flush=True)
+        help: 'list[str]' = [self._build_help(header=True)]
+
+        help.append("\nBasic commands:")
+        help.extend(self._build_help(command=c)
+                    for c in ("temp", "mode", "boost", "vacation", "status"))
+
+        help.append("\n\nConfiguration commands:")
+        help.extend(self._build_help(command=c)
+                    for c in ("program", "offset", "comforteco", "openwindow", "lock"))
+
+        help.append("\n\nSetup commands:")
+        help.extend(self._build_help(command=c)
+                    for c in ("scan", "aliases", "reset"))
+
+        help.append("\n\nOther commands:")
+        help.extend(self._build_help(command=c)
+                    for c in ("serial", "name", "vendor", "dump", "print", "commands", "json", "json-pretty", "serve", "daemon", "log", "macos-use-bdaddr", "help"))
+
+        help.append("\n\n")
+        sys.stderr.write("".join(help))
+        sys.stderr.flush()
 
     def to_human_readable(self, controller: ThermostatController, command_style: bool = False) -> str:
 
         def mode_to_human_readable(mode: Mode) -> str:
 
-            modes = mode.to_dict()
             if command_style:
+                # test the mode bits directly instead of scanning to_dict()
                 s = list()
-                if Mode.MODES[0] in modes:
-                    s.append(" --mode auto")
-                elif Mode.MODES[1] in modes:
-                    s.append(" --mode manual")
-                s.append(" --boost %s" %
-                         ("on" if Mode.MODES[3] in modes else "off"))
-                s.append(" --lock %s" %
-                         ("on" if Mode.MODES[6] in modes else "off"))
+                s.append(f" --mode {'manual' if mode.mode & Mode.MANUAL else 'auto'}")
+                s.append(f" --boost {'on' if mode.mode & Mode.BOOST else 'off'}")
+                s.append(f" --lock {'on' if mode.mode & Mode.LOCKED else 'off'}")
                 return "\n".join(s)
             else:
-                return ", ".join([m.lower().replace("_", " ") for m in modes])
+                return ", ".join([m.lower().replace("_", " ") for m in mode.to_dict()])
 
         def temp_to_human_readable(temp: 'Temperature | None') -> str:
 
@@ -347,9 +474,9 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
 
             if vacation and vacation.until:
                 if command_style:
-                    return "%s %s" % (vacation.until.strftime("%Y-%m-%d %H:%M"), temp_to_human_readable(temperature))
+                    return f"{vacation.until.isoformat(sep=' ', timespec='minutes')} {temp_to_human_readable(temperature)}"
                 else:
-                    return "%s until %s" % (temp_to_human_readable(temperature), vacation.until.strftime("%Y-%m-%d %H:%M"))
+                    return f"{temp_to_human_readable(temperature)} until {vacation.until.isoformat(sep=' ', timespec='minutes')}"
             else:
                 return "" if command_style else "off"
 
@@ -363,240 +490,362 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
             else:
                 return f"{temp_to_human_readable(openwindowconfig.temperature)} for {openwindowconfig.minutes} minutes"
 
-        def event_to_human_readable(event: Event) -> str:
+        # formatter is chosen once instead of per event
+        event_to_human_readable = _event_to_command if command_style else _event_to_readable
 
-            if command_style and event.hour == 24:
-                return f"{temp_to_human_readable(event.temperature)}"
-            elif command_style:
-                return f"{temp_to_human_readable(event.temperature)} {event.hour:02}:{event.minute:02}"
-            else:
-                return f"{temp_to_human_readable(event.temperature)} until {event.hour:02}:{event.minute:02}"
-
-        def program_to_human_readable(program: Optional[Program]) -> str:
-
-            if not program:
-                return ""
+        def program_to_human_readable(program: Program) -> 'list[str]':
 
-            if command_style:
-                return " ".join([event_to_human_readable(event=e) for e in program.events if e.hour != 0])
-            else:
-                return "\n".join(["    %s" % event_to_human_readable(event=e) for e in program.events if e.hour != 0])
+            return [event_to_human_readable(e) for e in program.events if e.hour != 0]
 
         def thermostat_to_human_readable(thermostat: Thermostat) -> str:
 
             s = list()
             s.append("")
-            s.append("Thermostat %s" % thermostat.address)
+            s.append(f"Thermostat {thermostat.address}")
             if thermostat.name and not command_style:
-                s.append("  Name:                %s" % thermostat.name)
+                s.append(f"  Name:                {thermostat.name}")
 
             if thermostat.vendor and not command_style:
-                s.append("  Vendor:              %s" % thermostat.vendor)
+                s.append(f"  Vendor:              {thermostat.vendor}")
 
             if thermostat.serialNumber and not command_style:
-                s.append("  Serial no.:          %s" % thermostat.serialNumber)
-                s.append("  Firmware:            %s" % thermostat.firmware)
+                s.append(f"  Serial no.:          {thermostat.serialNumber}")
+                s.append(f"  Firmware:            {thermostat.firmware}")
 
             if thermostat.mode and not command_style:
-                s.append("  Modes:               %s" %
-                         mode_to_human_readable(thermostat.mode))
-                s.append("  Temperature:         %s" %
-                         temp_to_human_readable(thermostat.temperature))
-                s.append("  Vacation:            %s" % vacation_to_human_readable(
-                    thermostat.vacation, temperature=thermostat.temperature))
-                s.append("  Valve:               %s" %
-                         (f"{thermostat.valve}%"))
+                s.append(f"  Modes:               {mode_to_human_readable(thermostat.mode)}")
+                s.append(f"  Temperature:         {temp_to_human_readable(thermostat.temperature)}")
+                s.append(f"  Vacation:            {vacation_to_human_readable(thermostat.vacation, temperature=thermostat.temperature)}")
+                s.append(f"  Valve:               {thermostat.valve}%")
                 s.append("")
-                s.append("  Comfort temperature: %s" %
-                         temp_to_human_readable(thermostat.comfortTemperature))
-                s.append("  Eco temperature:     %s" %
-                         temp_to_human_readable(thermostat.ecoTemperature))
-                s.append("  Open window mode:    %s" %
-                         openwindow_to_human_readable(thermostat.openWindowConfig))
-                s.append("  Offset temperature:  %s" %
-                         temp_to_human_readable(thermostat.offsetTemperature))
+                s.append(f"  Comfort temperature: {temp_to_human_readable(thermostat.comfortTemperature)}")
+                s.append(f"  Eco temperature:     {temp_to_human_readable(thermostat.ecoTemperature)}")
+                s.append(f"  Open window mode:    {openwindow_to_human_readable(thermostat.openWindowConfig)}")
+                s.append(f"  Offset temperature:  {temp_to_human_readable(thermostat.offsetTemperature)}")
                 s.append("")
             elif thermostat.mode:
                 s.append(mode_to_human_readable(thermostat.mode))
-                s.append(" --temp %s" %
-                         temp_to_human_readable(thermostat.temperature))
+                s.append(f" --temp {temp_to_human_readable(thermostat.temperature)}")
                 if thermostat.vacation and thermostat.vacation.until:
-                    s.append(" --vacation %s" % vacation_to_human_readable(
-                        thermostat.vacation, temperature=thermostat.temperature))
-                s.append(" --comforteco %s %s" % (
-                    temp_to_human_readable(thermostat.comfortTemperature),
-                    temp_to_human_readable(thermostat.ecoTemperature)))
-                s.append(" --openwindow %s" %
-                         openwindow_to_human_readable(thermostat.openWindowConfig))
-                s.append(" --offset %s" %
-                         temp_to_human_readable(thermostat.offsetTemperature))
-
-            if command_style:
-                s.extend([" --program %s %s" % (Program.DAYS[(d + 2) % 7], program_to_human_readable(thermostat.programs[(d + 2) %
-                                                                                                                         7])) for d in range(7) if thermostat.programs[(d + 2) % 7]])
-            else:
-                s.extend(["  Program on %s:\n%s\n" % (Program.DAYS_LONG[(d + 2) % 7], program_to_human_readable(thermostat.programs[(d + 2) %
-                                                                                                                                    7])) for d in range(7) if thermostat.programs[(d + 2) % 7]])
+                    s.append(f" --vacation {vacation_to_human_readable(thermostat.vacation, temperature=thermostat.temperature)}")
+                s.append(f" --comforteco {temp_to_human_readable(thermostat.comfortTemperature)} {temp_to_human_readable(thermostat.ecoTemperature)}")
+                s.append(f" --openwindow {openwindow_to_human_readable(thermostat.openWindowConfig)}")
+                s.append(f" --offset {temp_to_human_readable(thermostat.offsetTemperature)}")
+
+            for day in _DAY_ORDER:
+                program = thermostat.programs[day]
+                if not program:
+                    continue
+                elif command_style:
+                    s.append(f" --program {Program.DAYS[day]} {' '.join(program_to_human_readable(program))}")
+                else:
+                    # event lines go straight into the output instead of being joined per day
+                    s.append(f"  Program on {Program.DAYS_LONG[day]}:")
+                    s.extend(program_to_human_readable(program))
+                    s.append("")
 
             return "\n".join(s)
 
         return "\n\n".join([thermostat_to_human_readable(thermostat=t) for t in controller.thermostats])
 
-    async def process(self, addresses: 'list[str]', commands: 'list[dict]') -> None:
+    async def _cmd_temp(self, controller: ThermostatController, params: 'list') -> None:
 
-        try:
-            controller = ThermostatController(addresses=addresses)
+        if params[0] == "comfort":
+            await controller.setTemperatureComfort()
 
-            await controller.connect(timeout=15)
+        elif params[0] == "eco":
+            await controller.setTemperatureEco()
+
+        elif params[0] == "on":
+            await controller.setTemperatureOn()
+
+        elif params[0] == "off":
+            await controller.setTemperatureOff()
+
+        else:
+            await controller.setTemperature(temperature=_temperature(float(params[0])))
+
+    async def _cmd_mode(self, controller: ThermostatController, params: 'list') -> None:
+
+        if params[0] == "auto":
+            await controller.setModeAuto()
+
+        elif params[0] == "manual":
+            await controller.setModeManual()
+
+    async def _cmd_boost(self, controller: ThermostatController, params: 'list') -> None:
+
+        if not params or params[0] == "on":
+            await controller.setBoost(on=True)
+
+        elif params[0] == "off":
+            await controller.setBoost(on=False)
+
+    async def _cmd_status(self, controller: ThermostatController, params: 'list') -> None:
+
+        await controller.requestStatus()
+
+    async def _cmd_vacation(self, controller: ThermostatController, params: 'list') -> None:
+
+        if len(params) == 3:
+            temp = _temperature(float(params[2]))
+            # hours may be given with a single digit, fromisoformat requires hh:mm
+            datetime_ = datetime.fromisoformat(
+                "%sT%s" % (params[0], params[1].zfill(5)))
+            await controller.setVacation(temperature=temp, datetime_=datetime_)
+
+        elif len(params) == 2:
+
+            if ":" in params[0]:
+                temp = _temperature(float(params[1]))
+                hhmm = params[0].split(":")
+                await controller.setVacation(
+                    temperature=temp,
+                    time_=timedelta(hours=int(hhmm[0]), minutes=int(hhmm[1])))
+
+            else:
+                temp = _temperature(float(params[1]))
+                hours = int(params[0])
+                await controller.setVacation(
+                    temperature=temp,
+                    hours=hours)
+
+    async def _cmd_program(self, controller: ThermostatController, params: 'list') -> None:
+
+        if len(params) == 0:
+
+            await controller.requestProgram(day=Program.DAY_EVERYDAY)
+
+        elif len(params) == 1:
+
+            await controller.requestProgram(day=Program.DAYS_INDEX[params[0]])
+
+        else:
+            events: 'list[Event]' = list()
+            temp: 'Temperature | None' = None
+            program_params = params[1:]
+            for i, param in enumerate(program_params):
+                if i % 2:
+                    if temp is None:
+                        raise EqivaException(
+                            message="Invalid program definition")
+                    hour, minute = tuple(param.split(":"))
+                    events.append(
+                        Event(temperature=temp, hour=int(hour), minute=int(minute)))
+                else:
+                    temp = _temperature(float(param))
+
+            if temp is None:
+                raise EqivaException(
+                    message="Invalid program definition")
+
+            final_temperature = events[0].temperature if len(program_params) % 2 == 0 else temp
+            events.append(
+                Event(temperature=final_temperature, hour=24, minute=0))
+
+            await controller.setProgram(day=Program.DAYS_INDEX[params[0]], program=Program(events=events))
 
-            for command in commands:
-                if command[ThermostatCLI._COMMAND] == "temp":
+    async def _cmd_offset(self, controller: ThermostatController, params: 'list') -> None:
 
-                    if command[ThermostatCLI._PARAMS][0] == "comfort":
-                        await asyncio.gather(controller.setTemperatureComfort())
+        await controller.setOffsetTemperature(offset=_temperature(params[0]))
 
-                    elif command[ThermostatCLI._PARAMS][0] == "eco":
-                        await asyncio.gather(controller.setTemperatureEco())
+    async def _cmd_comforteco(self, controller: ThermostatController, params: 'list') -> None:
 
-                    elif command[ThermostatCLI._PARAMS][0] == "on":
-                        await asyncio.gather(controller.setTemperatureOn())
+        await controller.setComfortEcoTemperature(comfort=_temperature(params[0]), eco=_temperature(params[1]))
 
-                    elif command[ThermostatCLI._PARAMS][0] == "off":
-                        await asyncio.gather(controller.setTemperatureOff())
+    async def _cmd_openwindow(self, controller: ThermostatController, params: 'list') -> None:
 
-                    else:
-                        await asyncio.gather(controller.setTemperature(temperature=Temperature(valueC=float(command[ThermostatCLI._PARAMS][0]))))
+        openWindowConfig = OpenWindowConfig(temperature=_temperature(
+            params[0]), minutes=params[1])
+        await controller.setOpenWindow(openWindowConfig=openWindowConfig)
 
-                elif command[ThermostatCLI._COMMAND] == "mode":
+    async def _cmd_lock(self, controller: ThermostatController, params: 'list') -> None:
 
-                    if command[ThermostatCLI._PARAMS][0] == "auto":
-                        await asyncio.gather(controller.setModeAuto())
+        if not params or params[0] == "on":
+            await controller.setLock(on=True)
 
-                    elif command[ThermostatCLI._PARAMS][0] == "manual":
-                        await asyncio.gather(controller.setModeManual())
+        elif params[0] == "off":
+            await controller.setLock(on=False)
 
-                elif command[ThermostatCLI._COMMAND] == "boost":
+    async def _cmd_reset(self, controller: ThermostatController, params: 'list') -> None:
 
-                    if not command[ThermostatCLI._PARAMS] or command[ThermostatCLI._PARAMS][0] == "on":
-                        await asyncio.gather(controller.setBoost(on=True))
+        await controller.reset()
 
-                    elif command[ThermostatCLI._PARAMS][0] == "off":
-                        await asyncio.gather(controller.setBoost(on=False))
+    async def _cmd_serial(self, controller: ThermostatController, params: 'list') -> None:
 
-                elif command[ThermostatCLI._COMMAND] == "status":
-                    await asyncio.gather(controller.requestStatus())
+        await controller.requestSerialNo()
 
-                elif command[ThermostatCLI._COMMAND] == "vacation":
-                    if len(command[ThermostatCLI._PARAMS]) == 3:
-                        temp = Temperature(valueC=float(
-                            command[ThermostatCLI._PARAMS][2]))
-                        datetime_ = datetime.strptime(
-                            " ".join(command[ThermostatCLI._PARAMS][:2]), "%Y-%m-%d %H:%M")
-                        await asyncio.gather(controller.setVacation(temperature=temp, datetime_=datetime_))
+    async def _cmd_name(self, controller: ThermostatController, params: 'list') -> None:
 
-                    elif len(command[ThermostatCLI._PARAMS]) == 2:
+        await controller.requestName()
 
-                        if ":" in command[ThermostatCLI._PARAMS][0]:
-                            temp = Temperature(valueC=float(
-                                command[ThermostatCLI._PARAMS][1]))
-                            hhmm = command[ThermostatCLI._PARAMS][0].split(":")
-                            await asyncio.gather(
-                                controller.setVacation(
-                                    temperature=temp,
-                                    time_=timedelta(hours=int(hhmm[0]), minutes=int(hhmm[1]))))
+    async def _cmd_vendor(self, controller: ThermostatController, params: 'list') -> None:
 
-                        else:
-                            temp = Temperature(valueC=float(
-                                command[ThermostatCLI._PARAMS][1]))
-                            hours = int(command[ThermostatCLI._PARAMS][0])
-                            await asyncio.gather(
-                                controller.setVacation(
-                                    temperature=temp,
-                                    hours=hours))
+        await controller.requestVendor()
 
-                elif command[ThermostatCLI._COMMAND] == "program":
+    async def _cmd_dump(self, controller: ThermostatController, params: 'list') -> None:
 
-                    if len(command[ThermostatCLI._PARAMS]) == 0:
+        await controller.requestDeviceInfo()
 
-                        await asyncio.gather(controller.requestProgram(day=Program.DAY_EVERYDAY))
+    async def _cmd_print(self, controller: ThermostatController, params: 'list') -> None:
 
-                    elif len(command[ThermostatCLI._PARAMS]) == 1:
+        print(self.to_human_readable(
+            controller=controller), flush=True)
 
-                        await asyncio.gather(controller.requestProgram(day=Program.DAYS.index(command[ThermostatCLI._PARAMS][0])))
+    async def _cmd_commands(self, controller: ThermostatController, params: 'list') -> None:
 
-                    else:
-                        events: 'list[Event]' = list()
-                        temp: 'Temperature | None' = None
-                        program_params = command[ThermostatCLI._PARAMS][1:]
-                        for i, param in enumerate(program_params):
-                            if i % 2:
-                                if temp is None:
-                                    raise EqivaException(
-                                        message="Invalid program definition")
-                                hour, minute = tuple(param.split(":"))
-                                events.append(
-                                    Event(temperature=temp, hour=int(hour), minute=int(minute)))
-                            else:
-                                temp = Temperature(valueC=float(param))
+        print(self.to_human_readable(
+            controller=controller, command_style=True), flush=True)
 
-                        if temp is None:
-                            raise EqivaException(
-                                message="Invalid program definition")
+    async def _cmd_json(self, controller: ThermostatController, params: 'list') -> None:
 
-                        final_temperature = events[0].temperature if len(program_params) % 2 == 0 else temp
-                        events.append(
-                            Event(temperature=final_temperature, hour=24, minute=0))
+        print(_dumps(controller.to_dict()), flush=True)
 
-                        await asyncio.gather(controller.setProgram(day=Program.DAYS.index(command[ThermostatCLI._PARAMS][0]), program=Program(events=events)))
+    async def _cmd_json_pretty(self, controller: ThermostatController, params: 'list') -> None:
 
-                elif command[ThermostatCLI._COMMAND] == "offset":
+        print(_dumps(controller.to_dict(), pretty=True), flush=True)
 
-                    await asyncio.gather(controller.setOffsetTemperature(offset=Temperature(valueC=command[ThermostatCLI._PARAMS][0])))
+    async def _cmd_serve(self, controller: ThermostatController, params: 'list') -> None:
 
-                elif command[ThermostatCLI._COMMAND] == "comforteco":
+        loop = asyncio.get_running_loop()
+        while True:
+            line: str = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
 
-                    await asyncio.gather(controller.setComfortEcoTemperature(comfort=Temperature(valueC=command[ThermostatCLI._PARAMS][0]), eco=Temperature(valueC=command[ThermostatCLI._PARAMS][1])))
+            try:
+                args = shlex.split(line)
+                if not args:
+                    continue
 
-                elif command[ThermostatCLI._COMMAND] == "openwindow":
+                _, commands = self.parse_args(args)
+                await self._execute(controller, [c for c in commands if c[ThermostatCLI._COMMAND] not in _SESSION_COMMANDS])
 
-                    openWindowConfig = OpenWindowConfig(temperature=Temperature(
-                        valueC=command[ThermostatCLI._PARAMS][0]), minutes=command[ThermostatCLI._PARAMS][1])
-                    await asyncio.gather(controller.setOpenWindow(openWindowConfig=openWindowConfig))
+            except EqivaException as ex:
+                LOGGER.error(ex.message)
 
-                elif command[ThermostatCLI._COMMAND] == "lock":
+            except BleakError as ex:
+                LOGGER.error(str(ex))
 
-                    if not command[ThermostatCLI._PARAMS] or command[ThermostatCLI._PARAMS][0] == "on":
-                        await asyncio.gather(controller.setLock(on=True))
+            except Exception as ex:
+                # a bad line, e.g. unbalanced quotes or an invalid date, must not end the session
+                LOGGER.error(f"{type(ex).__name__}: {ex}")
 
-                    elif command[ThermostatCLI._PARAMS][0] == "off":
-                        await asyncio.gather(controller.setLock(on=False))
+    async def _cmd_daemon(self, controller: ThermostatController, params: 'list') -> None:
 
-                elif command[ThermostatCLI._COMMAND] == "reset":
+        if not hasattr(asyncio, "start_unix_server"):
+            raise EqivaException(message="--daemon requires unix domain sockets")
 
-                    await asyncio.gather(controller.reset())
+        idle_timeout: int = params[0]
+        activity = asyncio.Event()
+        lock = asyncio.Lock()
+        # open client connections, closed on shutdown so that idle clients do not keep the server alive
+        writers: 'set[asyncio.StreamWriter]' = set()
+        handlers: 'set[asyncio.Task]' = set()
+        # requests read but not yet answered, the time spent on them is not idle
+        busy = 0
+        closing = False
 
-                elif command[ThermostatCLI._COMMAND] == "serial":
-                    await asyncio.gather(controller.requestSerialNo())
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
 
-                elif command[ThermostatCLI._COMMAND] == "name":
-                    await asyncio.gather(controller.requestName())
+            nonlocal busy
+            handlers.add(asyncio.current_task())
+            writers.add(writer)
+            try:
+                # a request that only arrives while shutting down is not started anymore
+                while (line := await reader.readline()) and not closing:
+                    busy += 1
+                    try:
+                        try:
+                            args = json.loads(line)
+                        except ValueError:
+                            args = None
 
-                elif command[ThermostatCLI._COMMAND] == "vendor":
-                    await asyncio.gather(controller.requestVendor())
+                        try:
+                            if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+                                raise EqivaException(message="Expected a json array of arguments")
 
-                elif command[ThermostatCLI._COMMAND] == "dump":
-                    await asyncio.gather(controller.requestDeviceInfo())
+                            _, commands = self.parse_args(args)
+                            async with lock:
+                                await self._execute(controller, [c for c in commands if c[ThermostatCLI._COMMAND] not in _SESSION_COMMANDS])
+                                response = {"ok": True, "thermostats": controller.to_dict()}
 
-                elif command[ThermostatCLI._COMMAND] == "print":
-                    print(self.to_human_readable(
-                        controller=controller), flush=True)
+                        except EqivaException as ex:
+                            response = {"ok": False, "error": ex.message}
 
-                elif command[ThermostatCLI._COMMAND] == "commands":
-                    print(self.to_human_readable(
-                        controller=controller, command_style=True), flush=True)
+                        except BleakError as ex:
+                            response = {"ok": False, "error": str(ex)}
 
-                elif command[ThermostatCLI._COMMAND] == "json":
-                    print(json.dumps(controller.to_dict(), indent=2), flush=True)
+                        except Exception as ex:
+                            # any other failure, e.g. an invalid date or a timeout, is reported to the client
+                            LOGGER.error(f"{type(ex).__name__}: {ex}")
+                            response = {"ok": False, "error": str(ex) or type(ex).__name__}
+
+                        writer.write(_dumps(response).encode() + b"\n")
+                        await writer.drain()
+
+                    finally:
+                        busy -= 1
+                        # the idle timeout starts over once the reply is out
+                        activity.set()
+
+            finally:
+                handlers.discard(asyncio.current_task())
+                writers.discard(writer)
+                writer.close()
+
+        path = _socket_path(controller.addresses)
+        try:
+            st = os.lstat(path)
+        except FileNotFoundError:
+            pass
+        else:
+            # only replace a stale socket of a previous daemon of the same user
+            if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+                raise EqivaException(message=f"{path} exists and is not a socket owned by the current user")
+            os.remove(path)
+
+        server = await asyncio.start_unix_server(handle, path=path)
+        os.chmod(path, 0o600)
+        LOGGER.info(f"Serving on {path}, idle timeout {idle_timeout}s")
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(activity.wait(), timeout=idle_timeout)
+                    activity.clear()
+                except asyncio.TimeoutError:
+                    if not busy:
+                        break
+
+        finally:
+            server.close()
+            # requests in progress are answered before their connections are dropped
+            while busy:
+                activity.clear()
+                await activity.wait()
+            closing = True
+            for writer in list(writers):
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await server.wait_closed()
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def _execute(self, controller: ThermostatController, commands: 'list[dict]') -> None:
+
+        for command in commands:
+            handler = self._dispatch.get(command[ThermostatCLI._COMMAND])
+            if handler:
+                await handler(controller, command.get(ThermostatCLI._PARAMS))
+
+    async def process(self, addresses: 'list[str]', commands: 'list[dict]') -> None:
+
+        try:
+            controller = ThermostatController(addresses=addresses)
+
+            await controller.connect(timeout=15)
+
+            await self._execute(controller, commands)
 
         except EqivaException as ex:
             LOGGER.error(ex.message)
@@ -621,18 +870,20 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
 
             cmd_def = ThermostatCLI.COMMANDS[cmd]
 
-            regex: str = cmd_def[ThermostatCLI._REGEX]
-            if regex and not re.match(regex, " ".join(command[ThermostatCLI._ARGS])):
-                errors.append(
-                    self._build_help(cmd, False,
-                                     "ERROR: Please check parameters of command\n")
-                )
+            validator = _VALIDATORS.get(cmd)
+            if validator:
+                valid = validator(command[ThermostatCLI._ARGS])
+            else:
+                valid = not cmd_def.regex or cmd_def.regex.match(" ".join(command[ThermostatCLI._ARGS]))
+
+            if not valid:
+                errors.append(ThermostatCLI._error_help(cmd))
                 continue
 
-            if cmd_def[ThermostatCLI._TYPES]:
+            if cmd_def.types:
                 params = []
                 for i, arg in enumerate(command[ThermostatCLI._ARGS]):
-                    params.append(cmd_def[ThermostatCLI._TYPES][i](arg))
+                    params.append(cmd_def.types[i](arg))
 
                 command["params"] = params
 
@@ -645,27 +896,27 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
 
         return commands
 
-    def parse_args(self, argv: 'list[str]') -> 'tuple[set[str], list[dict]]':
+    def parse_args(self, argv: 'list[str]') -> 'tuple[list[str], list[dict]]':
 
-        addresses: 'set[str]' = set()
+        # at most a handful of addresses, a list keeps them in the given order
+        addresses: 'list[str]' = list()
         commands: 'list[dict]' = list()
 
         cmd_group = False
         for arg in argv:
 
-            is_cmd = arg.startswith("--")
+            is_cmd = arg.startswith(_CMD_PREFIX)
             cmd_group |= is_cmd
             if not cmd_group:
-                _addresses = self.alias.resolve(arg)
-                if _addresses:
-                    for a in _addresses:
-                        addresses.add(a)
-                else:
-                    addresses.add(arg)
+                # without alias file only mac addresses need to be resolved
+                _addresses = self.alias.resolve(arg) if self._has_aliases or ":" in arg else None
+                for a in (_addresses or (arg,)):
+                    if a not in addresses:
+                        addresses.append(a)
 
             elif is_cmd:
                 commands.append({
-                    "command": arg[2:],
+                    "command": arg[_CMD_PREFIX_LEN:],
                     "args": list()
                 })
 
@@ -675,3 +926,4 @@ USAGE:   eqiva.py <mac_1/alias_1> [<mac_2/alias_2>] ... --<command_1> [<param_1>
         self.transform_commands(commands)
 
         return addresses, commands
+
@@ -1,7 +1,7 @@
 import asyncio
-import time
+import operator
 from datetime import datetime, timedelta
-from typing import List, Optional, Set
+from typing import Iterable, Optional, Set
 
 from bleak import BleakScanner
 from bleak.backends.device import BLEDevice
@@ -26,12 +26,17 @@ class ThermostatController():
     def __init__(self, addresses: 'list[str]') -> None:
 
         self.addresses: 'list[str]' = addresses
+        # normalized once so that scan callbacks can do O(1) lookups
+        self.addresses_set: 'frozenset[str]' = frozenset(
+            a.upper() if ":" in a else a for a in addresses)
         self.thermostats: 'list' = list()
+        # connected subset of thermostats, maintained on (dis)connect
+        self._connected: 'list[Thermostat]' = list()
 
     async def connect(self, timeout) -> None:
 
         LOGGER.info("Request to connect to %s" % ", ".join(self.addresses))
-        devices = await ThermostatController.scan(duration=timeout + len(self.addresses), filter_=self.addresses)
+        devices = await ThermostatController.scan(duration=timeout + len(self.addresses), filter_=self.addresses_set)
         LOGGER.debug("Found devices are %s" % (
             ", ".join([f"{d.name} ({d.address})" for d in devices]) if devices else "n/a"))
 
@@ -39,79 +44,75 @@ class ThermostatController():
             raise EqivaException(
                 message="Could not find all given addresses")
         else:
-            self.thermostats = [Thermostat(device.address) for device in devices]
+            self.thermostats = [Thermostat(device.address, disconnected_callback=self._onDisconnected)
+                                for device in devices]
 
         coros = [thermostat.connect() for thermostat in self.thermostats]
         await asyncio.gather(*coros)
+        self._connected = [
+            thermostat for thermostat in self.thermostats if thermostat.is_connected]
 
     async def disconnect(self) -> None:
 
-        coros = [thermostat.disconnect()
-                 for thermostat in self.thermostats if thermostat.is_connected]
+        coros = [thermostat.disconnect() for thermostat in self._connected]
+        self._connected = list()
         await asyncio.gather(*coros)
 
-    async def setTemperature(self, temperature: Temperature) -> 'list':
+    def _onDisconnected(self, thermostat) -> None:
+
+        if thermostat in self._connected:
+            self._connected.remove(thermostat)
+
+    async def _fanout(self, method: str, **kwargs) -> 'list':
+
+        call = operator.methodcaller(method, **kwargs)
+        thermostats = list(self._connected)
+        # every thermostat finishes its command, even if another one fails
+        results = await asyncio.gather(*(call(thermostat) for thermostat in thermostats),
+                                       return_exceptions=True)
+        errors = [(t, r) for t, r in zip(thermostats, results) if isinstance(r, BaseException)]
+        for thermostat, error in errors[1:]:
+            LOGGER.error(f"{thermostat.address}: {method} failed: {type(error).__name__}: {getattr(error, 'message', error)}")
+        if errors:
+            raise errors[0][1]
 
-        coros = [thermostat.setTemperature(temperature=temperature)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
         return self.thermostats
 
+    async def setTemperature(self, temperature: Temperature) -> 'list':
+
+        return await self._fanout("setTemperature", temperature=temperature)
+
     async def setTemperatureComfort(self) -> 'list':
 
-        coros = [thermostat.setTemperatureComfort()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setTemperatureComfort")
 
     async def setTemperatureEco(self) -> 'list':
 
-        coros = [thermostat.setTemperatureEco()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setTemperatureEco")
 
     async def setTemperatureOn(self) -> 'list':
 
-        coros = [thermostat.setTemperatureOn()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setTemperatureOn")
 
     async def setTemperatureOff(self) -> 'list':
 
-        coros = [thermostat.setTemperatureOff()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setTemperatureOff")
 
     async def setModeAuto(self) -> 'list':
 
-        coros = [thermostat.setModeAuto()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setModeAuto")
 
     async def setModeManual(self) -> 'list':
 
-        coros = [thermostat.setModeManual()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setModeManual")
 
     async def setBoost(self, on: bool) -> 'list':
 
-        coros = [thermostat.setBoost(on=on)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setBoost", on=on)
 
     async def requestStatus(self) -> 'list':
 
-        coros = [thermostat.requestStatus()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("requestStatus")
 
     async def setVacation(self, temperature: Temperature, datetime_: Optional[datetime] = None, time_: Optional[timedelta] = None, hours: int = 0) -> 'list':
 
@@ -122,90 +123,65 @@ class ThermostatController():
         else:
             vacation = Vacation(until=datetime.now() + timedelta(hours=hours))
 
-        coros = [thermostat.setVacation(temperature=temperature, vacation=vacation)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setVacation", temperature=temperature, vacation=vacation)
 
     async def requestProgram(self, day: int) -> 'list':
 
-        coros = [thermostat.requestProgram(day=day)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        # resolve today / tomorrow once so that all thermostats agree on the day
+        day = Program.resolveDay(day)
+        return await self._fanout("requestProgram", day=day)
 
     async def setProgram(self, day: int, program: Program) -> 'list':
 
-        coros = [thermostat.setProgram(day=day, program=program)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        day = Program.resolveDay(day)
+        return await self._fanout("setProgram", day=day, program=program)
 
     async def setOffsetTemperature(self, offset: Temperature) -> 'list':
 
-        coros = [thermostat.setOffsetTemperature(offset=offset)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setOffsetTemperature", offset=offset)
 
     async def setComfortEcoTemperature(self, comfort: Temperature, eco: Temperature) -> 'list':
 
-        coros = [thermostat.setComfortEcoTemperature(comfort=comfort, eco=eco)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setComfortEcoTemperature", comfort=comfort, eco=eco)
 
     async def setOpenWindow(self, openWindowConfig: OpenWindowConfig) -> 'list':
 
-        coros = [thermostat.setOpenWindow(openWindowConfig=openWindowConfig)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setOpenWindow", openWindowConfig=openWindowConfig)
 
     async def setLock(self, on: bool) -> 'list':
 
-        coros = [thermostat.setLock(on=on)
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("setLock", on=on)
 
     async def reset(self) -> 'list':
 
-        coros = [thermostat.reset()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("reset")
 
     async def requestSerialNo(self) -> 'list':
 
-        coros = [thermostat.requestSerialNo()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("requestSerialNo")
 
     async def requestName(self) -> 'list':
 
-        coros = [thermostat.requestName()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("requestName")
 
     async def requestVendor(self) -> 'list':
 
-        coros = [thermostat.requestVendor()
-                 for thermostat in self.thermostats if thermostat.is_connected]
-        await asyncio.gather(*coros)
-        return self.thermostats
+        return await self._fanout("requestVendor")
 
     async def requestDeviceInfo(self) -> 'list':
 
-        for thermostat in self.thermostats:
+        async def _requestDeviceInfo(thermostat: Thermostat) -> None:
+
+            # requests to the same thermostat must stay in order
             await thermostat.requestName()
             await thermostat.requestVendor()
             await thermostat.requestSerialNo()
             await thermostat.requestStatus()
             await thermostat.requestProgram(Program.DAY_EVERYDAY)
 
+        coros = [_requestDeviceInfo(thermostat)
+                 for thermostat in self._connected]
+        await asyncio.gather(*coros)
         return self.thermostats
 
     def to_dict(self) -> 'list[dict]':
@@ -213,26 +189,33 @@ class ThermostatController():
         return [t.to_dict() for t in self.thermostats]
 
     @staticmethod
-    async def scan(duration: int = 20, filter_: Optional[List[str]] = None, listener: Optional[Listener] = None) -> Set[BLEDevice]:
+    async def scan(duration: int = 20, filter_: Optional[Iterable[str]] = None, listener: Optional[Listener] = None) -> Set[BLEDevice]:
 
-        found_devices: 'set[BLEDevice]' = set()
+        seen_addresses: 'set[str]' = set()
         found_bulbs: 'set[BLEDevice]' = set()
-        if filter_:
-            consumed_filter = [m for m in filter_]
-        else:
-            consumed_filter = None
+        # addresses and names are consumed separately, both with O(1) discards
+        address_filter: 'set[str]' = {m.upper() for m in filter_ if ":" in m} if filter_ else set()
+        name_filter: 'set[str]' = {m for m in filter_ if ":" not in m} if filter_ else set()
+        all_found = asyncio.Event()
+        mac_prefix = Thermostat.MAC_PREFIX
 
         def callback(device: BLEDevice, advertising_data: AdvertisementData):
 
-            if device not in found_devices and device.name:
-                found_devices.add(device)
-                if device.address.upper().startswith(Thermostat.MAC_PREFIX):
+            # each address is normalized once and only evaluated on its first named advert
+            address = device.address.upper() if device.name else None
+            if address and address not in seen_addresses:
+                seen_addresses.add(address)
+                if address.startswith(mac_prefix):
 
-                    if consumed_filter and device.address not in found_bulbs:
-                        if device.address in consumed_filter or device.name in consumed_filter:
+                    if address_filter or name_filter:
+                        if address in address_filter or device.name in name_filter:
                             found_bulbs.add(device)
-                            consumed_filter.remove(
-                                device.address if device.address in consumed_filter else device.name)
+                            if address in address_filter:
+                                address_filter.discard(address)
+                            else:
+                                name_filter.discard(device.name)
+                            if not address_filter and not name_filter:
+                                all_found.set()
                             if listener:
                                 listener.onScanFound(device)
 
@@ -249,10 +232,11 @@ class ThermostatController():
             scanner_kwargs["cb"] = {"use_bdaddr": ThermostatController.use_bdaddr}
 
         async with BleakScanner(callback, **scanner_kwargs) as scanner:
-            if consumed_filter:
-                start_time = time.time()
-                while consumed_filter and (start_time + duration) > time.time():
-                    await asyncio.sleep(.1)
+            if address_filter or name_filter:
+                try:
+                    await asyncio.wait_for(all_found.wait(), timeout=duration)
+                except asyncio.TimeoutError:
+                    pass
             elif duration:
                 await asyncio.sleep(duration)
             else:
@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from bleak import BleakClient
+from bleak.exc import BleakError
+
+from .Thermostat import Thermostat
+from .EqivaException import EqivaException
+
+import logManager
+
+LOGGER = logManager.logger.get_logger(__name__)
+
+class ThermostatPool():
+
+    def __init__(self) -> None:
+
+        self._thermostats: 'dict[str, Thermostat]' = dict()
+        # one lock per thermostat, requests to the same device must not interleave
+        self._locks: 'dict[str, asyncio.Lock]' = dict()
+        # reconnect tasks started when a pooled thermostat drops its connection
+        self._keepalive: 'dict[str, asyncio.Task]' = dict()
+
+    def _lock(self, address: str) -> asyncio.Lock:
+
+        lock = self._locks.get(address)
+        if lock is None:
+            lock = self._locks[address] = asyncio.Lock()
+        return lock
+
+    async def _connect(self, address: str) -> Thermostat:
+
+        thermostat = self._thermostats.get(address)
+        if thermostat is None:
+            thermostat = self._thermostats[address] = Thermostat(address, disconnected_callback=self._onDisconnected)
+
+        # reconnecting also subscribes to notifications again
+        if not thermostat.is_connected:
+            LOGGER.debug(f"{address}: no open connection in pool")
+            await thermostat.connect()
+
+        return thermostat
+
+    def _onDisconnected(self, client: BleakClient) -> None:
+
+        address = client.address.upper()
+        # thermostats closed by the pool are not pooled anymore and stay disconnected
+        if self._thermostats.get(address) is client and address not in self._keepalive:
+            self._keepalive[address] = asyncio.get_running_loop().create_task(self._reconnect(address))
+
+    async def _reconnect(self, address: str) -> None:
+
+        try:
+            async with self._lock(address):
+                if address in self._thermostats:
+                    LOGGER.debug(f"{address}: connection lost, reconnecting")
+                    await self._connect(address)
+
+        except (EqivaException, BleakError, asyncio.TimeoutError) as ex:
+            # the next acquire() or session() tries again
+            LOGGER.warning(f"{address}: reconnect failed: {getattr(ex, 'message', None) or str(ex) or type(ex).__name__}")
+
+        finally:
+            self._keepalive.pop(address, None)
+
+    async def acquire(self, address: str) -> Thermostat:
+
+        # connects under the device's lock but returns without holding it, use session() for exclusive access
+        address = address.upper()
+        async with self._lock(address):
+            return await self._connect(address)
+
+    @asynccontextmanager
+    async def session(self, address: str) -> AsyncIterator[Thermostat]:
+
+        address = address.upper()
+        async with self._lock(address):
+            yield await self._connect(address)
+
+    async def requestStatus(self) -> 'list[Thermostat]':
+
+        async def _requestStatus(address: str, thermostat: Thermostat) -> None:
+
+            async with self._lock(address):
+                if thermostat.is_connected:
+                    await thermostat.requestStatus()
+
+        await asyncio.gather(*(_requestStatus(address, thermostat)
+                               for address, thermostat in self._thermostats.items()))
+        return list(self._thermostats.values())
+
+    async def close(self) -> None:
+
+        thermostats = self._thermostats
+        self._thermostats = dict()
+        keepalive = list(self._keepalive.values())
+        for task in keepalive:
+            task.cancel()
+        await asyncio.gather(*keepalive, return_exceptions=True)
+
+        async def _disconnect(address: str, thermostat: Thermostat) -> None:
+
+            # open sessions on the device finish first
+            async with self._lock(address):
+                if thermostat.is_connected:
+                    await thermostat.disconnect()
+
+        await asyncio.gather(*(_disconnect(address, thermostat)
+                               for address, thermostat in thermostats.items()))
+
+    async def __aenter__(self) -> 'ThermostatPool':
+
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+
+        await self.close()
@@ -1,35 +1,41 @@
-from datetime import datetime, timedelta
+import struct
+from datetime import datetime
 from typing import Optional
 
+# day, year - 2000, half hours of day, month
+_VACATION = struct.Struct("BBBB")
+
 class Vacation():
 
     def __init__(self, until: Optional[datetime] = None):
 
-        self.until: Optional[datetime] = (
-            until - timedelta(minutes=until.minute % 30)) if until else None
+        self.until: Optional[datetime] = until.replace(
+            minute=until.minute // 30 * 30, second=0, microsecond=0) if until else None
 
     @staticmethod
     def fromBytes(bytes: bytearray) -> 'Vacation':
 
         v = Vacation()
-        if bytes[0] > 0:
-            v.until = datetime(day=bytes[0], month=bytes[3], year=2000 +
-                               bytes[1], hour=bytes[2] // 2, minute=bytes[2] % 2 * 30)
+        day, year, halfHours, month = _VACATION.unpack_from(bytes)
+        if day > 0:
+            v.until = datetime(day=day, month=month, year=2000 +
+                               year, hour=halfHours // 2, minute=halfHours % 2 * 30)
         return v
 
-    def toBytes(self) -> bytearray:
+    def toBytes(self) -> bytes:
 
         if self.until is None:
             raise ValueError("Vacation 'until' is not set")
 
-        return bytearray([self.until.day, self.until.year - 2000, self.until.hour * 2 + self.until.minute // 30, self.until.month])
+        return _VACATION.pack(self.until.day, self.until.year - 2000,
+                              self.until.hour * 2 + self.until.minute // 30, self.until.month)
 
     def to_dict(self) -> dict:
 
         return {
-            "until": (self.until.strftime("%Y-%m-%d %H:%M") if self.until else None)
+            "until": (self.until.isoformat(sep=" ", timespec="minutes") if self.until else None)
         }
 
     def __str__(self):
 
-        return "Vacation(until=%s)" % (self.until.strftime("%Y-%m-%d %H:%M") if self.until else "off")
+        return "Vacation(until=%s)" % (self.until.isoformat(sep=" ", timespec="minutes") if self.until else "off")
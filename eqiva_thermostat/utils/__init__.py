@@ -3,6 +3,7 @@
 # Import main classes that might be used by other projects
 from .Thermostat import Thermostat
 from .ThermostatController import ThermostatController
+from .ThermostatPool import ThermostatPool
 from .ThermostatCLI import ThermostatCLI
 from .Temperature import Temperature
 from .Mode import Mode
@@ -15,6 +16,7 @@ from .EqivaException import EqivaException
 __all__ = [
     'Thermostat',
     'ThermostatController', 
+    'ThermostatPool',
     'ThermostatCLI',
     'Temperature',
     'Mode',
@@ -3,7 +3,7 @@ import asyncio
 from datetime import datetime, timedelta
 
 from eqiva_thermostat import (EqivaException, Event, OpenWindowConfig, Program,
-                              Temperature, Thermostat, Vacation)
+                              Temperature, Thermostat, ThermostatPool, Vacation)
 
 
 async def do_stuff() -> None:
@@ -66,28 +66,28 @@ async def do_stuff() -> None:
 
 async def do_stuff1() -> None:
 
-    thermostat = Thermostat('00:1A:22:16:3D:E7')
-    try:
-        await thermostat.connect()
+    # the pool keeps connections open between sessions and closes them on exit
+    async with ThermostatPool() as pool:
+        try:
+            async with pool.session('00:1A:22:16:3D:E7') as thermostat:
 
-        # Meta information
-        await thermostat.requestName()
-        await thermostat.requestVendor()
-        await thermostat.requestSerialNo()
+                # Meta information
+                await thermostat.requestName()
+                await thermostat.requestVendor()
+                await thermostat.requestSerialNo()
 
-        # request current status
-        await thermostat.requestStatus()
-        print(str(thermostat))
+                # request current status
+                await thermostat.requestStatus()
+                print(str(thermostat))
 
-        # get programs
-        await thermostat.requestProgram(day=Program.DAY_MONDAY)
-        print(thermostat.programs[Program.DAY_MONDAY])
+            async with pool.session('00:1A:22:16:3D:E7') as thermostat:
 
-    except EqivaException as ex:
-        print(ex.message)
+                # get programs, reusing the open connection
+                await thermostat.requestProgram(day=Program.DAY_MONDAY)
+                print(thermostat.programs[Program.DAY_MONDAY])
 
-    if thermostat:
-        await thermostat.disconnect()
+        except EqivaException as ex:
+            print(ex.message)
 
 
 if __name__ == '__main__':
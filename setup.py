@@ -37,6 +37,9 @@ setup(
         "bleak",
         "logManager @ git+https://github.com/hendriksen-mark/logManager.git"
     ],
+    extras_require={
+        "fast": ["orjson"],
+    },
     entry_points={
         "console_scripts": [
             "eqiva=eqiva_thermostat:main",
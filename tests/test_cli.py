@@ -0,0 +1,159 @@
+import asyncio
+import io
+import json
+import os
+import sys
+
+import pytest
+from bleak.exc import BleakError
+
+from eqiva_thermostat import EqivaException, ThermostatCLI
+from eqiva_thermostat.utils.ThermostatCLI import _socket_path
+
+
+class FakeController():
+
+    def __init__(self) -> None:
+
+        self.addresses = ["00:1A:22:00:00:01"]
+        self.temperatures: 'list[float]' = list()
+        self.delay = 0.0
+
+    async def setTemperature(self, temperature) -> None:
+
+        await asyncio.sleep(self.delay)
+        self.temperatures.append(temperature.valueC)
+
+    async def setTemperatureOff(self) -> None:
+
+        raise asyncio.TimeoutError()
+
+    async def setTemperatureOn(self) -> None:
+
+        raise BleakError("Device disconnected")
+
+    def to_dict(self) -> 'list[dict]':
+
+        return [{"mac": self.addresses[0], "temperatures": self.temperatures}]
+
+
+@pytest.fixture
+def cli(monkeypatch, tmp_path) -> ThermostatCLI:
+
+    # --aliases only prints the (empty) alias file and leaves a ready instance
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(sys, "argv", ["eqiva.py", "--aliases"])
+    return ThermostatCLI()
+
+
+def test_serve_skips_bad_lines(cli, monkeypatch):
+
+    monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join([
+        "--temp 21.5",
+        "--temp '21.0",
+        "--vacation 2030-02-30 10:00 20.0",
+        "--temp on",
+        "--temp off",
+        "--temp 99",
+        "",
+        "--temp 22.0",
+    ]) + "\n"))
+    controller = FakeController()
+
+    asyncio.run(cli._cmd_serve(controller, None))
+
+    assert controller.temperatures == [21.5, 22.0]
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"), reason="requires unix domain sockets")
+def test_daemon_protocol(cli, monkeypatch, tmp_path):
+
+    runtime_dir = tmp_path / "run"
+    runtime_dir.mkdir(mode=0o700)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(runtime_dir))
+    controller = FakeController()
+    path = _socket_path(controller.addresses)
+
+    async def request(reader, writer, line: bytes) -> dict:
+
+        writer.write(line + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    async def scenario() -> None:
+
+        daemon = asyncio.create_task(cli._cmd_daemon(controller, [1]))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+        reader, writer = await asyncio.open_unix_connection(path)
+
+        response = await request(reader, writer, b'["--temp", "21.5"]')
+        assert response == {"ok": True, "thermostats": [
+            {"mac": "00:1A:22:00:00:01", "temperatures": [21.5]}]}
+
+        response = await request(reader, writer, b"not json")
+        assert response["ok"] is False
+
+        response = await request(reader, writer, b'["--temp", "off"]')
+        assert response == {"ok": False, "error": "TimeoutError"}
+
+        response = await request(reader, writer, b'["--vacation", "2030-02-30", "10:00", "20.0"]')
+        assert response["ok"] is False
+
+        # the client stays connected but idle, the daemon still shuts down
+        await asyncio.wait_for(daemon, timeout=5)
+        assert await reader.readline() == b""
+        writer.close()
+
+    asyncio.run(scenario())
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"), reason="requires unix domain sockets")
+def test_daemon_waits_for_slow_command(cli, monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    controller = FakeController()
+    controller.delay = 0.5
+    path = _socket_path(controller.addresses)
+
+    async def scenario() -> None:
+
+        # the command takes longer than the idle timeout
+        daemon = asyncio.create_task(cli._cmd_daemon(controller, [0.2]))
+        while not os.path.exists(path):
+            await asyncio.sleep(0.01)
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(b'["--temp", "21.5"]\n')
+        await writer.drain()
+
+        response = json.loads(await asyncio.wait_for(reader.readline(), timeout=5))
+        assert response["ok"] is True
+        assert controller.temperatures == [21.5]
+        assert not daemon.done()
+
+        await asyncio.wait_for(daemon, timeout=5)
+        writer.close()
+
+    asyncio.run(scenario())
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not hasattr(asyncio, "start_unix_server"), reason="requires unix domain sockets")
+def test_daemon_refuses_foreign_file(cli, monkeypatch, tmp_path):
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    controller = FakeController()
+    path = _socket_path(controller.addresses)
+    with open(path, "w") as f:
+        f.write("not a socket")
+
+    with pytest.raises(EqivaException) as ex:
+        asyncio.run(cli._cmd_daemon(controller, [1]))
+
+    assert "not a socket" in ex.value.message
+    assert os.path.isfile(path)
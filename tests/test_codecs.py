@@ -0,0 +1,193 @@
+import math
+import random
+import re
+from datetime import datetime
+
+import pytest
+
+from eqiva_thermostat.utils.EqivaException import EqivaException
+from eqiva_thermostat.utils.Event import Event
+from eqiva_thermostat.utils.Mode import Mode
+from eqiva_thermostat.utils.OpenWindowConfig import OpenWindowConfig
+from eqiva_thermostat.utils.Program import Program
+from eqiva_thermostat.utils.Temperature import Temperature
+from eqiva_thermostat.utils.ThermostatCLI import _VALIDATORS
+from eqiva_thermostat.utils.Vacation import Vacation
+
+# the expected values below follow the original per-byte implementations
+
+
+def _payloads() -> 'list[bytes]':
+
+    # any temperature byte, time slots up to 24:50
+    rnd = random.Random(0)
+    return [bytes([0x22, 0x24, 0x2a, 0x48, 0x22, 0x90] + [0] * 8), bytes(14), bytes([0xff, 149] * 7)] + \
+        [bytes(rnd.randrange(256) if i % 2 == 0 else rnd.randrange(150) for i in range(14)) for _ in range(100)]
+
+
+def _event_dict(raw_temperature: int, raw_time: int) -> dict:
+
+    valueC = raw_temperature / 2
+    return {
+        "temperature": {"valueC": valueC, "valueF": (valueC * 9.0/5.0) + 32.0},
+        "until": f"{raw_time // 6:02}:{raw_time % 6 * 10:02}"
+    }
+
+
+@pytest.mark.parametrize("payload", _payloads())
+def test_program_round_trip(payload):
+
+    program = Program.fromBytes(bytearray(payload))
+    assert program.toBytes() == payload
+
+    pairs = list(zip(payload[0::2], payload[1::2]))
+    assert [(e.temperature.valueC, e.hour, e.minute) for e in program.events] == \
+        [(t / 2, s // 6, s % 6 * 10) for t, s in pairs]
+    assert program.to_dict() == [_event_dict(t, s) for t, s in pairs if s // 6 != 0]
+
+    # encoded again from the decoded events
+    assert program.toBytes() == payload
+
+
+def test_program_rejects_invalid_time_slot():
+
+    with pytest.raises(EqivaException):
+        Program.fromBytes(bytearray([0x22, 150] + [0] * 12))
+
+    with pytest.raises(EqivaException):
+        Event.fromBytes(bytearray([0x22, 150]))
+
+
+def test_program_events_are_decoded_lazily():
+
+    program = Program.fromBytes(bytearray([0x22, 0x24, 0x2a, 0x48, 0x22, 0x90] + [0] * 8))
+    assert program._events is None
+
+    assert str(program) == ("Program(Event(temperature=Temperature(celcius=17.0°C, fahrenheit=62.6°F), until=06:00), "
+                            "Event(temperature=Temperature(celcius=21.0°C, fahrenheit=69.8°F), until=12:00), "
+                            "Event(temperature=Temperature(celcius=17.0°C, fahrenheit=62.6°F), until=24:00))")
+
+    # in-place edits show up in the string and the payload
+    program.events[0] = Event(temperature=Temperature(18.0), hour=5)
+    assert str(program).startswith("Program(Event(temperature=Temperature(celcius=18.0°C, fahrenheit=64.4°F), until=05:00)")
+    assert program.toBytes() == bytes([0x24, 0x1e, 0x2a, 0x48, 0x22, 0x90] + [0] * 8)
+
+
+def test_program_from_events():
+
+    program = Program(events=[Event(temperature=Temperature(17.0), hour=6),
+                              Event(temperature=Temperature(21.0), hour=22, minute=30),
+                              Event(temperature=Temperature(17.0), hour=24)])
+    assert program.toBytes() == bytes([0x22, 0x24, 0x2a, 0x87, 0x22, 0x90] + [0] * 8)
+
+    with pytest.raises(EqivaException):
+        Program(events=[])
+
+    with pytest.raises(EqivaException):
+        Program(events=[Event(temperature=Temperature(17.0), hour=24)] * 8)
+
+
+@pytest.mark.parametrize("until, payload", [
+    (datetime(2030, 2, 28, 10, 45), bytes([28, 30, 21, 2])),
+    (datetime(2000, 1, 1, 0, 0), bytes([1, 0, 0, 1])),
+    (datetime(2099, 12, 31, 23, 59), bytes([31, 99, 47, 12])),
+])
+def test_vacation_round_trip(until, payload):
+
+    vacation = Vacation(until)
+    assert vacation.toBytes() == payload
+
+    decoded = Vacation.fromBytes(bytearray(payload))
+    assert decoded.until == until.replace(minute=until.minute // 30 * 30)
+    assert decoded.toBytes() == payload
+    assert decoded.to_dict() == {"until": decoded.until.strftime("%Y-%m-%d %H:%M")}
+
+
+def test_vacation_off():
+
+    vacation = Vacation.fromBytes(bytearray([0, 30, 21, 2]))
+    assert vacation.until is None
+    assert vacation.to_dict() == {"until": None}
+
+    with pytest.raises(ValueError):
+        vacation.toBytes()
+
+
+@pytest.mark.parametrize("mode", range(256))
+def test_mode_bits(mode):
+
+    expected = [] if mode & Mode.MANUAL else ["AUTO"]
+    expected.extend([m for i, m in enumerate(Mode.MODES[1:]) if mode & 2**i == 2**i])
+    assert Mode(mode=mode).to_dict() == expected
+
+
+@pytest.mark.parametrize("valueC", [-5.0, -4.5, -0.5, 0.0, 4.5, 4.25, 29.5, 30.0, 30.5, math.nan])
+def test_temperature_bounds(valueC):
+
+    valid = -4.5 <= valueC <= 30.0 and valueC * 10 % 5 == 0
+    if valid:
+        assert Temperature(valueC).toByte() == int(valueC * 2)
+    else:
+        with pytest.raises(EqivaException):
+            Temperature(valueC)
+
+
+@pytest.mark.parametrize("minutes", [-5, 0, 3, 5, 990, 995, 1000])
+def test_openwindow_bounds(minutes):
+
+    if 0 <= minutes <= 995 and minutes % 5 == 0:
+        config = OpenWindowConfig(temperature=Temperature(12.0), minutes=minutes)
+        assert config.toBytes() == bytes([24, minutes // 5])
+        decoded = OpenWindowConfig.fromBytes(bytearray(config.toBytes()))
+        assert (decoded.temperature.valueC, decoded.minutes) == (12.0, minutes)
+    else:
+        with pytest.raises(EqivaException):
+            OpenWindowConfig(temperature=Temperature(12.0), minutes=minutes)
+
+
+@pytest.mark.parametrize("hour, minute", [(-1, 0), (0, 0), (23, 50), (24, 0), (24, 10), (25, 0), (12, 5), (12, 60)])
+def test_event_bounds(hour, minute):
+
+    if 0 <= hour <= 24 and 0 <= minute <= 50 and minute % 10 == 0:
+        event = Event(temperature=Temperature(20.0), hour=hour, minute=minute)
+        assert event.toBytes() == bytearray([40, hour * 6 + minute // 10])
+    else:
+        with pytest.raises(EqivaException):
+            Event(temperature=Temperature(20.0), hour=hour, minute=minute)
+
+
+# the regular expressions the set lookups replaced
+_TEMP = r"(4\.5|[5-9]\.[05]|[12][0-9]\.[05]|30\.0)"
+_BASELINE = {
+    "temp": re.compile(rf"^(on|off|comfort|eco|{_TEMP[1:-1]})$"),
+    "offset": re.compile(r"^-?[0-3]\.[05]$"),
+    "comforteco": re.compile(rf"^{_TEMP} {_TEMP}$"),
+    "openwindow": re.compile(rf"^{_TEMP} (\d{{0,2}}[05])$"),
+}
+
+_CANDIDATES = [f"{v / 2:.1f}" for v in range(-12, 66)] + \
+    ["4.0", "4.50", "04.5", "5", "+1.0", "-0.0", "-4.0", "1e1", "", " 5.0", "on", "off", "comfort", "eco", "ON"]
+_MINUTES = ["", "0", "5", "05", "10", "12", "95", "990", "995", "1000", "0995", "-5", "5.0", "a5"]
+
+
+@pytest.mark.parametrize("command", ["temp", "offset"])
+def test_single_parameter_validators(command):
+
+    for candidate in _CANDIDATES:
+        assert bool(_VALIDATORS[command]([candidate])) == bool(_BASELINE[command].match(candidate)), candidate
+
+
+def test_comforteco_validator():
+
+    for comfort in _CANDIDATES:
+        for eco in ("4.5", "30.0", "30.5", "on"):
+            args = [comfort, eco]
+            assert bool(_VALIDATORS["comforteco"](args)) == bool(_BASELINE["comforteco"].match(" ".join(args))), args
+
+
+def test_openwindow_validator():
+
+    for temperature in ("4.0", "4.5", "12.0", "30.0", "30.5"):
+        for minutes in _MINUTES:
+            args = [temperature, minutes]
+            assert bool(_VALIDATORS["openwindow"](args)) == bool(_BASELINE["openwindow"].match(" ".join(args))), args
@@ -0,0 +1,147 @@
+import asyncio
+import sys
+
+import pytest
+
+from eqiva_thermostat.utils.ThermostatPool import ThermostatPool
+
+
+class FakeThermostat():
+
+    def __init__(self, address: str, disconnected_callback=None) -> None:
+
+        self.address = address
+        self.disconnected_callback = disconnected_callback
+        self.is_connected = False
+        self.connects = 0
+        self.disconnects = 0
+
+    async def connect(self) -> None:
+
+        self.connects += 1
+        self.is_connected = True
+
+    async def disconnect(self) -> None:
+
+        self.disconnects += 1
+        self.drop()
+
+    def drop(self) -> None:
+
+        # bleak reports every lost connection, requested or not, through the callback
+        self.is_connected = False
+        if self.disconnected_callback:
+            self.disconnected_callback(self)
+
+
+@pytest.fixture(autouse=True)
+def fake_thermostat(monkeypatch) -> None:
+
+    # the package re-exports the class under the module's name, patch the module itself
+    monkeypatch.setattr(sys.modules[ThermostatPool.__module__], "Thermostat", FakeThermostat)
+
+
+def test_acquire_reuses_connection():
+
+    async def scenario() -> None:
+
+        pool = ThermostatPool()
+        first = await pool.acquire("00:1a:22:00:00:01")
+        second = await pool.acquire("00:1A:22:00:00:01")
+
+        assert first is second
+        assert first.connects == 1
+
+    asyncio.run(scenario())
+
+
+def test_acquire_reconnects_dropped_connection():
+
+    async def scenario() -> None:
+
+        pool = ThermostatPool()
+        thermostat = await pool.acquire("00:1A:22:00:00:01")
+        thermostat.is_connected = False
+
+        assert await pool.acquire("00:1A:22:00:00:01") is thermostat
+        assert thermostat.connects == 2
+        assert thermostat.is_connected
+
+    asyncio.run(scenario())
+
+
+def test_session_releases_lock_on_error():
+
+    async def scenario() -> None:
+
+        pool = ThermostatPool()
+        with pytest.raises(RuntimeError):
+            async with pool.session("00:1A:22:00:00:01"):
+                raise RuntimeError("command failed")
+
+        assert not pool._lock("00:1A:22:00:00:01").locked()
+        async with pool.session("00:1A:22:00:00:01") as thermostat:
+            assert thermostat.is_connected
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_close_disconnects_all():
+
+    async def scenario() -> None:
+
+        async with ThermostatPool() as pool:
+            thermostats = [await pool.acquire(address)
+                           for address in ("00:1A:22:00:00:01", "00:1A:22:00:00:02")]
+
+        assert [t.disconnects for t in thermostats] == [1, 1]
+        assert not any(t.is_connected for t in thermostats)
+        assert pool._thermostats == dict()
+
+    asyncio.run(scenario())
+
+
+def test_keepalive_reconnects_dropped_connection():
+
+    async def scenario() -> None:
+
+        pool = ThermostatPool()
+        thermostat = await pool.acquire("00:1A:22:00:00:01")
+        thermostat.drop()
+        await asyncio.gather(*pool._keepalive.values())
+
+        assert thermostat.is_connected
+        assert thermostat.connects == 2
+
+    asyncio.run(scenario())
+
+
+def test_close_waits_for_open_session():
+
+    async def scenario() -> None:
+
+        pool = ThermostatPool()
+        entered = asyncio.Event()
+        release = asyncio.Event()
+
+        async def use() -> bool:
+
+            async with pool.session("00:1A:22:00:00:01") as thermostat:
+                entered.set()
+                await release.wait()
+                return thermostat.is_connected
+
+        session = asyncio.create_task(use())
+        await entered.wait()
+        closing = asyncio.create_task(pool.close())
+        await asyncio.sleep(0.05)
+        assert not closing.done()
+
+        release.set()
+        assert await session
+        await closing
+
+        # disconnecting on close does not start a reconnect
+        assert pool._keepalive == dict()
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))